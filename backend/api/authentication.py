@@ -0,0 +1,114 @@
+import copy
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+class TokenUserCache:
+    """
+    Кэш разрешения токена в пользователя в памяти процесса.
+    Записи живут не дольше timeout секунд, при переполнении вытесняются
+    самые давние. Актуальность записи проверяется по версии токена
+    в общем кэше Django (shared_cache): версия меняется после фиксации
+    удаления токена (выход) и сохранения или удаления пользователя,
+    в том числе смены пароля, поэтому запись перестает действовать
+    во всех воркерах сразу. Версия читается до загрузки пользователя
+    из базы: если загрузка пересеклась с изменением, у записи
+    окажется устаревшая версия и она не будет использована.
+    """
+    version_prefix = 'auth:token_version:'
+
+    def __init__(self, timeout, max_size, shared_cache):
+        self.timeout = timeout
+        self.max_size = max_size
+        self.shared_cache = shared_cache
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    @property
+    def enabled(self):
+        return self.timeout > 0
+
+    def get_version(self, key):
+        return self.shared_cache.get(self.version_prefix + key)
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+        if self.get_version(key) != entry[3]:
+            with self.lock:
+                if self.entries.get(key) is entry:
+                    del self.entries[key]
+            return None
+        return entry[0], entry[1]
+
+    def set(self, key, user, token, version):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = (
+                user, token, time.monotonic() + self.timeout, version
+            )
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, keys):
+        """
+        Меняет версии токенов. Версия хранится дольше любой записи,
+        загруженной до изменения.
+        """
+        if not self.enabled or not keys:
+            return
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+        self.shared_cache.set_many(
+            {self.version_prefix + key: uuid.uuid4().hex for key in keys},
+            timeout=self.timeout + 1
+        )
+
+    def invalidate_user(self, user_id):
+        if self.enabled:
+            self.invalidate(list(
+                Token.objects.filter(user_id=user_id)
+                .values_list('key', flat=True)
+            ))
+
+
+token_cache = TokenUserCache(
+    settings.AUTH_TOKEN_CACHE_SECONDS, settings.AUTH_TOKEN_CACHE_SIZE, cache
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication с кэшированием пользователя по токену.
+    В кэш попадают только действительные токены активных пользователей,
+    проверки и ошибки те же, что у TokenAuthentication. Каждый запрос
+    получает свою копию пользователя, изменения в одном запросе
+    не видны другим.
+    """
+    def authenticate_credentials(self, key):
+        if not token_cache.enabled:
+            return super().authenticate_credentials(key)
+        cached = token_cache.get(key)
+        if cached is None:
+            version = token_cache.get_version(key)
+            cached = super().authenticate_credentials(key)
+            token_cache.set(key, *cached, version)
+        user, token = map(copy.copy, cached)
+        token.user = user
+        return user, token
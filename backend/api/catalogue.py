@@ -0,0 +1,52 @@
+import gzip
+import threading
+
+from recipes.models import Ingredient
+
+from .renderers import FastJSONRenderer
+
+CATALOGUE_FIELDS = ('id', 'name', 'measurement_unit')
+
+
+class IngredientCatalogue:
+    """
+    Полный каталог ингредиентов, заранее отрендеренный в JSON
+    и сжатый gzip, в памяти процесса.
+    Каталог хранится для одной версии данных (количество строк
+    и время последнего изменения) и перестраивается при первом
+    запросе после изменения ингредиентов в любом воркере.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.blobs = {}
+
+    def get(self, version, compact):
+        """
+        Возвращает пару (JSON, JSON в gzip) для версии каталога.
+        В компактном виде ингредиент — список [id, name, measurement_unit].
+        """
+        with self.lock:
+            if version != self.version:
+                self.version = version
+                self.blobs = {}
+            blob = self.blobs.get(compact)
+        if blob is not None:
+            return blob
+        blob = self.build(compact)
+        with self.lock:
+            if version == self.version:
+                self.blobs[compact] = blob
+        return blob
+
+    def build(self, compact):
+        queryset = Ingredient.objects.all()
+        data = list(
+            queryset.values_list(*CATALOGUE_FIELDS) if compact
+            else queryset.values(*CATALOGUE_FIELDS)
+        )
+        content = FastJSONRenderer().render(data)
+        return content, gzip.compress(content, mtime=0)
+
+
+ingredient_catalogue = IngredientCatalogue()
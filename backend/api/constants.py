@@ -1,2 +1,10 @@
 DEFAULT_RECIPES_LIMIT = 3
 DEFAULT_PAGE_SIZE = 6
+MAX_BULK_RECIPES = 1000
+MAX_INGREDIENTS_LIMIT = 100
+MAX_MEAL_PLAN_DAYS = 92
+MEAL_PLAN_CACHE_SECONDS = 3600
+SYNC_PAGE_SIZE = 500
+# Записи журнала моложе этого интервала не отдаются при синхронизации:
+# транзакция с меньшим номером записи может еще не быть зафиксирована.
+SYNC_SETTLE_SECONDS = 2
@@ -16,3 +16,38 @@ class Base64ImageField(serializers.ImageField):
             data = ContentFile(base64.b64decode(imgstr), name='temp.' + ext)
 
         return super().to_internal_value(data)
+
+
+def resolve_pks(queryset, pks):
+    """
+    Получает объекты по списку первичных ключей одним запросом id__in.
+    Возвращает объекты в порядке ключей или сообщает сразу обо всех
+    отсутствующих ключах.
+    """
+    objects = queryset.all().in_bulk(set(pks))
+    missing = [pk for pk in pks if pk not in objects]
+    if missing:
+        raise serializers.ValidationError(
+            f'{queryset.model._meta.verbose_name_plural} '
+            f'с id {missing} не найдены.'
+        )
+    return [objects[pk] for pk in pks]
+
+
+class BulkPrimaryKeyRelatedField(serializers.ListField):
+    """
+    Поле для списка связанных объектов по первичным ключам.
+    В отличие от PrimaryKeyRelatedField(many=True) получает все объекты
+    одним запросом.
+    """
+    child = serializers.IntegerField(min_value=1)
+
+    def __init__(self, queryset, **kwargs):
+        self.queryset = queryset
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        return resolve_pks(self.queryset, super().to_internal_value(data))
+
+    def to_representation(self, value):
+        return [obj.pk for obj in value]
@@ -1,12 +1,46 @@
+from django.db.models import F
 from django_filters import rest_framework as filters
-from recipes.models import Ingredient, Recipe, Tag
+from django_filters.constants import EMPTY_VALUES
+from recipes.models import Ingredient, MealPlan, Recipe, Tag
+
+
+class RecipeOrderingFilter(filters.ChoiceFilter):
+    """
+    Сортировка списка рецептов.
+    Допускается только одно значение из ORDERINGS, и для каждого есть
+    индекс модели Recipe с тем же порядком, поэтому ни один запрос
+    не сортирует таблицу целиком. Рецепты без калорийности или
+    стоимости идут в конце при любом направлении.
+    """
+    ORDERINGS = {
+        'name': (F('name').asc(), F('id').asc()),
+        '-name': (F('name').desc(), F('id').desc()),
+        'cooking_time': (F('cooking_time').asc(), F('id').asc()),
+        '-cooking_time': (F('cooking_time').desc(), F('id').desc()),
+        'popularity': (F('favorites_count').desc(), F('id').desc()),
+        'newest': (F('id').desc(),),
+        'calories': (F('calories').asc(nulls_last=True), F('id').asc()),
+        '-calories': (F('calories').desc(nulls_last=True), F('id').desc()),
+        'cost': (F('cost').asc(nulls_last=True), F('id').asc()),
+        '-cost': (F('cost').desc(nulls_last=True), F('id').desc()),
+    }
+
+    def __init__(self, *args, **kwargs):
+        kwargs['choices'] = [(value, value) for value in self.ORDERINGS]
+        super().__init__(*args, **kwargs)
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        return qs.order_by(*self.ORDERINGS[value])
 
 
 class RecipeFilter(filters.FilterSet):
     """
     Фильтр для рецептов.
-    Позволяет фильтровать рецепты по автору, тегам,
-    наличию в списке покупок и избранном.
+    Позволяет фильтровать рецепты по автору, тегам, времени
+    приготовления, наличию в списке покупок и избранном
+    и сортировать их (RecipeOrderingFilter).
     """
     tags = filters.ModelMultipleChoiceFilter(
         field_name='tags__slug',
@@ -17,10 +51,22 @@ class RecipeFilter(filters.FilterSet):
         method='filter_is_in_shopping_cart'
     )
     is_favorited = filters.BooleanFilter(method='filter_is_favorited')
+    min_calories = filters.NumberFilter(
+        field_name='calories', lookup_expr='gte'
+    )
+    max_calories = filters.NumberFilter(
+        field_name='calories', lookup_expr='lte'
+    )
+    min_cost = filters.NumberFilter(field_name='cost', lookup_expr='gte')
+    max_cost = filters.NumberFilter(field_name='cost', lookup_expr='lte')
+    ordering = RecipeOrderingFilter()
 
     class Meta:
         model = Recipe
-        fields = ('author', 'tags')
+        fields = {
+            'author': ['exact'],
+            'cooking_time': ['gte', 'lte'],
+        }
 
     def filter_is_in_shopping_cart(self, queryset, name, value):
         user = getattr(self.request, 'user', None)
@@ -45,3 +91,12 @@ class IngredientFilter(filters.FilterSet):
     class Meta:
         model = Ingredient
         fields = ('name',)
+
+
+class MealPlanFilter(filters.FilterSet):
+    start = filters.DateFilter(field_name='date', lookup_expr='gte')
+    end = filters.DateFilter(field_name='date', lookup_expr='lte')
+
+    class Meta:
+        model = MealPlan
+        fields = ('start', 'end', 'recipe')
@@ -0,0 +1,23 @@
+import threading
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+hashing_slots = threading.BoundedSemaphore(
+    settings.PASSWORD_HASHING_CONCURRENCY
+)
+
+
+class ConcurrencyLimitedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2PasswordHasher с ограничением числа одновременных вычислений.
+    Алгоритм, число итераций и формат хеша те же, что у стандартного
+    хешера, поэтому существующие пароли проверяются без изменений.
+    Хеш вычисляется в потоке запроса, одновременно в процессе — не больше
+    PASSWORD_HASHING_CONCURRENCY хешей. Остальные запросы регистрации
+    и входа ждут своей очереди, занимая поток воркера, но не процессор,
+    нужный другим запросам.
+    """
+    def encode(self, password, salt, iterations=None):
+        with hashing_slots:
+            return super().encode(password, salt, iterations)
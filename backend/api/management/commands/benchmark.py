@@ -0,0 +1,368 @@
+import json
+import math
+import random
+import re
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import requests
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
+                            ShoppingCart, Tag, generate_short_uuid)
+from rest_framework.authtoken.models import Token
+from users.models import MyUser, Subscription
+
+BENCH_EMAIL_DOMAIN = 'bench.local'
+BENCH_TAG_PREFIX = 'bench-tag-'
+BENCH_INGREDIENT_PREFIX = 'bench-ingredient-'
+QUERY_COUNT_RE = re.compile(r'desc="(\d+) queries"')
+
+# Набор запросов с весами, приближенный к реальной нагрузке.
+# Каждый сценарий: (название, вес, нужна ли авторизация, ожидаемые
+# коды ошибок клиента). Поиск ингредиентов выполняется с авторизацией:
+# анонимные запросы теста приходят с одного адреса и упирались бы
+# в ограничение частоты, а не в производительность приложения.
+# Повторное добавление в избранное и корзину отвечает 400, это
+# ожидаемый результат, а не ошибка.
+SCENARIOS = (
+    ('GET /api/recipes/', 25, False, ()),
+    ('GET /api/recipes/?tags=', 8, False, ()),
+    ('GET /api/recipes/?is_favorited=1', 4, True, ()),
+    ('GET /api/recipes/?is_in_shopping_cart=1', 3, True, ()),
+    ('GET /api/recipes/{id}/', 20, False, ()),
+    ('GET /api/recipes/{id}/get-link/', 2, False, ()),
+    ('GET /api/tags/', 5, False, ()),
+    ('GET /api/ingredients/?name=', 10, True, ()),
+    ('GET /api/users/', 3, False, ()),
+    ('GET /api/users/{id}/', 3, False, ()),
+    ('GET /api/users/me/', 4, True, ()),
+    ('GET /api/users/subscriptions/', 5, True, ()),
+    ('GET /api/recipes/download_shopping_cart/', 3, True, ()),
+    ('POST /api/recipes/{id}/favorite/', 3, True, (400,)),
+    ('POST /api/recipes/{id}/shopping_cart/', 2, True, (400,)),
+)
+
+
+def percentile(values, percent):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(math.ceil(percent / 100 * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ('git', 'rev-parse', '--short', 'HEAD'),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими данными, нагружает запущенный '
+        'сервер смесью запросов к API и сохраняет задержки p50/p95/p99 '
+        'и количество SQL-запросов по каждому endpoint в JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url', default='http://localhost:8000',
+            help='Адрес запущенного сервера.'
+        )
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--recipes', type=int, default=500)
+        parser.add_argument('--tags', type=int, default=10)
+        parser.add_argument('--ingredients', type=int, default=200)
+        parser.add_argument(
+            '--ingredients-per-recipe', type=int, default=8
+        )
+        parser.add_argument('--subscriptions-per-user', type=int, default=5)
+        parser.add_argument('--favorites-per-user', type=int, default=10)
+        parser.add_argument('--cart-per-user', type=int, default=5)
+        parser.add_argument(
+            '--requests', type=int, default=2000,
+            help='Общее количество запросов.'
+        )
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--no-seed', action='store_true',
+            help='Использовать уже созданные синтетические данные.'
+        )
+        parser.add_argument(
+            '--output', default='benchmark.json',
+            help='Файл для сохранения результатов.'
+        )
+        parser.add_argument(
+            '--compare',
+            help='JSON с результатами предыдущего запуска для сравнения.'
+        )
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        if not options['no_seed']:
+            self.stdout.write('Создание синтетических данных...')
+            self.seed(options)
+        self.load_dataset()
+        if not self.recipe_ids or not self.tokens:
+            self.stderr.write(
+                'Нет синтетических данных, запустите команду без --no-seed.'
+            )
+            return
+        self.stdout.write(
+            f'Нагрузка {options["base_url"]}: {options["requests"]} '
+            f'запросов в {options["concurrency"]} потоков...'
+        )
+        results = self.run(options)
+        report = self.build_report(results, options)
+        self.print_report(report)
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        self.stdout.write(f'Результаты сохранены в {options["output"]}')
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as file:
+                self.print_comparison(json.load(file), report)
+
+    @transaction.atomic
+    def seed(self, options):
+        MyUser.objects.filter(
+            email__endswith=f'@{BENCH_EMAIL_DOMAIN}'
+        ).delete()
+        Tag.objects.filter(slug__startswith=BENCH_TAG_PREFIX).delete()
+        Ingredient.objects.filter(
+            name__startswith=BENCH_INGREDIENT_PREFIX
+        ).delete()
+        password = make_password('bench-password')
+        users = MyUser.objects.bulk_create([
+            MyUser(
+                email=f'user{i}@{BENCH_EMAIL_DOMAIN}',
+                username=f'bench_user_{i}',
+                first_name='Bench',
+                last_name=f'User {i}',
+                password=password,
+            )
+            for i in range(options['users'])
+        ])
+        Token.objects.bulk_create([
+            Token(user=user, key=Token.generate_key()) for user in users
+        ])
+        tags = Tag.objects.bulk_create([
+            Tag(name=f'Bench tag {i}', slug=f'{BENCH_TAG_PREFIX}{i}')
+            for i in range(options['tags'])
+        ])
+        ingredients = Ingredient.objects.bulk_create([
+            Ingredient(
+                name=f'{BENCH_INGREDIENT_PREFIX}{i}',
+                measurement_unit=self.random.choice(('г', 'мл', 'шт.'))
+            )
+            for i in range(options['ingredients'])
+        ])
+        recipes = Recipe.objects.bulk_create([
+            Recipe(
+                author=self.random.choice(users),
+                name=f'Bench recipe {i}',
+                image='recipes/images/bench.png',
+                text='Синтетический рецепт для нагрузочного тестирования.',
+                cooking_time=self.random.randint(5, 180),
+                short_uuid=generate_short_uuid(),
+            )
+            for i in range(options['recipes'])
+        ])
+        per_recipe = min(options['ingredients_per_recipe'], len(ingredients))
+        RecipeIngredient.objects.bulk_create([
+            RecipeIngredient(
+                recipe=recipe,
+                ingredient=ingredient,
+                amount=self.random.randint(1, 500)
+            )
+            for recipe in recipes
+            for ingredient in self.random.sample(ingredients, per_recipe)
+        ])
+        Recipe.tags.through.objects.bulk_create([
+            Recipe.tags.through(recipe=recipe, tag=tag)
+            for recipe in recipes
+            for tag in self.random.sample(tags, min(2, len(tags)))
+        ])
+        Subscription.objects.bulk_create([
+            Subscription(user=user, author=author)
+            for user in users
+            for author in self.random.sample(
+                users, min(options['subscriptions_per_user'], len(users))
+            )
+            if author != user
+        ])
+        for model, per_user in (
+            (Favorite, options['favorites_per_user']),
+            (ShoppingCart, options['cart_per_user']),
+        ):
+            model.objects.bulk_create([
+                model(user=user, recipe=recipe)
+                for user in users
+                for recipe in self.random.sample(
+                    recipes, min(per_user, len(recipes))
+                )
+            ])
+
+    def load_dataset(self):
+        self.tokens = list(Token.objects.filter(
+            user__email__endswith=f'@{BENCH_EMAIL_DOMAIN}'
+        ).values_list('key', flat=True))
+        self.user_ids = list(MyUser.objects.filter(
+            email__endswith=f'@{BENCH_EMAIL_DOMAIN}'
+        ).values_list('id', flat=True))
+        self.recipe_ids = list(Recipe.objects.filter(
+            author__email__endswith=f'@{BENCH_EMAIL_DOMAIN}'
+        ).values_list('id', flat=True))
+        self.tag_slugs = list(Tag.objects.filter(
+            slug__startswith=BENCH_TAG_PREFIX
+        ).values_list('slug', flat=True))
+        self.ingredient_names = list(Ingredient.objects.filter(
+            name__startswith=BENCH_INGREDIENT_PREFIX
+        ).values_list('name', flat=True))
+
+    def build_request(self, scenario, rng):
+        recipe_id = rng.choice(self.recipe_ids)
+        method, path = scenario.split(' ', 1)
+        path = path.replace('{id}', str(
+            rng.choice(self.user_ids) if path.startswith('/api/users/')
+            else recipe_id
+        ))
+        if path.endswith('?tags=') and self.tag_slugs:
+            path += rng.choice(self.tag_slugs)
+        elif path.endswith('?name='):
+            path += rng.choice(self.ingredient_names or ['а'])[:12]
+        if path == '/api/recipes/':
+            path += f'?page={rng.randint(1, 5)}'
+        return method, path
+
+    def run(self, options):
+        base_url = options['base_url'].rstrip('/')
+        weights = [weight for _, weight, *_ in SCENARIOS]
+        plan = self.random.choices(SCENARIOS, weights, k=options['requests'])
+        seeds = [self.random.random() for _ in plan]
+        local = threading.local()
+
+        def execute(index):
+            scenario, _, needs_auth, expected_statuses = plan[index]
+            rng = random.Random(seeds[index])
+            session = getattr(local, 'session', None)
+            if session is None:
+                session = local.session = requests.Session()
+            headers = {}
+            if needs_auth:
+                headers['Authorization'] = f'Token {rng.choice(self.tokens)}'
+            method, path = self.build_request(scenario, rng)
+            started = time.perf_counter()
+            response = session.request(
+                method, base_url + path, headers=headers
+            )
+            duration = time.perf_counter() - started
+            if method == 'POST' and response.status_code == 201:
+                session.delete(base_url + path, headers=headers)
+            match = QUERY_COUNT_RE.search(
+                response.headers.get('Server-Timing', '')
+            )
+            return (
+                scenario,
+                duration,
+                int(match.group(1)) if match else None,
+                response.status_code < 400
+                or response.status_code in expected_statuses
+            )
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            results = list(pool.map(execute, range(len(plan))))
+        self.elapsed = time.perf_counter() - started
+        return results
+
+    def summarize(self, durations, queries, errors):
+        durations_ms = [duration * 1000 for duration in durations]
+        known_queries = [count for count in queries if count is not None]
+        return {
+            'count': len(durations_ms),
+            'errors': errors,
+            'mean_ms': round(sum(durations_ms) / len(durations_ms), 2),
+            'p50_ms': round(percentile(durations_ms, 50), 2),
+            'p95_ms': round(percentile(durations_ms, 95), 2),
+            'p99_ms': round(percentile(durations_ms, 99), 2),
+            'queries_per_request': (
+                round(sum(known_queries) / len(known_queries), 2)
+                if known_queries else None
+            ),
+        }
+
+    def build_report(self, results, options):
+        grouped = defaultdict(lambda: ([], [], 0))
+        for scenario, duration, queries, ok in results:
+            durations, query_counts, errors = grouped[scenario]
+            durations.append(duration)
+            query_counts.append(queries)
+            grouped[scenario] = (durations, query_counts, errors + (not ok))
+        return {
+            'commit': current_commit(),
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'config': {
+                key: options[key] for key in (
+                    'base_url', 'users', 'recipes', 'tags', 'ingredients',
+                    'requests', 'concurrency', 'seed'
+                )
+            },
+            'total': {
+                **self.summarize(
+                    [result[1] for result in results],
+                    [result[2] for result in results],
+                    sum(not result[3] for result in results),
+                ),
+                'elapsed_s': round(self.elapsed, 2),
+                'rps': round(len(results) / self.elapsed, 2),
+            },
+            'endpoints': {
+                scenario: self.summarize(*grouped[scenario])
+                for scenario in sorted(grouped)
+            },
+        }
+
+    def print_report(self, report):
+        header = (
+            f'{"endpoint":<45}{"count":>7}{"err":>5}{"p50":>9}'
+            f'{"p95":>9}{"p99":>9}{"queries":>9}'
+        )
+        self.stdout.write(header)
+        rows = list(report['endpoints'].items()) + [('total', report['total'])]
+        for name, stats in rows:
+            queries = stats['queries_per_request']
+            self.stdout.write(
+                f'{name:<45}{stats["count"]:>7}{stats["errors"]:>5}'
+                f'{stats["p50_ms"]:>9}{stats["p95_ms"]:>9}'
+                f'{stats["p99_ms"]:>9}'
+                f'{"-" if queries is None else queries:>9}'
+            )
+        self.stdout.write(f'RPS: {report["total"]["rps"]}')
+
+    def print_comparison(self, previous, current):
+        self.stdout.write(
+            f'Сравнение с {previous.get("commit")} (p95, мс / запросы):'
+        )
+        for name, stats in current['endpoints'].items():
+            old = previous['endpoints'].get(name)
+            if old is None:
+                continue
+            delta = stats['p95_ms'] - old['p95_ms']
+            self.stdout.write(
+                f'{name:<45}{old["p95_ms"]:>9} -> {stats["p95_ms"]:<9}'
+                f'({delta:+.2f}) {old["queries_per_request"]} -> '
+                f'{stats["queries_per_request"]}'
+            )
@@ -0,0 +1,85 @@
+import json
+import statistics
+import time
+
+from api.renderers import FastJSONRenderer, orjson
+from api.serializers import IngredientSerializer, RecipeReadSerializer
+from api.views import RecipeViewSet
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from recipes.models import Ingredient
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+RENDERERS = (
+    ('JSONRenderer', JSONRenderer),
+    ('FastJSONRenderer', FastJSONRenderer),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время рендеринга JSON стандартным JSONRenderer '
+        'и FastJSONRenderer для списка ингредиентов и страницы рецептов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=100)
+        parser.add_argument(
+            '--repeat', type=int, default=50,
+            help='Количество повторов рендеринга каждого набора данных.'
+        )
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING(
+                'orjson не установлен, FastJSONRenderer использует '
+                'стандартный json.'
+            ))
+        payloads = (
+            ('ingredients', self._ingredients()),
+            (f'recipes[{options["recipes"]}]',
+             self._recipes(options['recipes'])),
+        )
+        for name, data in payloads:
+            if not data:
+                raise CommandError(
+                    f'Нет данных для {name}: заполните базу командой '
+                    'generate_fixture_data.'
+                )
+            self._compare(name, data, options['repeat'])
+
+    def _ingredients(self):
+        return IngredientSerializer(Ingredient.objects.all(), many=True).data
+
+    def _recipes(self, limit):
+        request = Request(APIRequestFactory().get('/api/recipes/'))
+        request.user = AnonymousUser()
+        return RecipeReadSerializer(
+            RecipeViewSet.queryset[:limit],
+            many=True,
+            context={'request': request},
+        ).data
+
+    def _compare(self, name, data, repeat):
+        results = {}
+        for renderer_name, renderer_class in RENDERERS:
+            renderer = renderer_class()
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                content = renderer.render(data)
+                timings.append(time.perf_counter() - started)
+            results[renderer_name] = (statistics.median(timings), content)
+        contents = [json.loads(content) for _, content in results.values()]
+        if any(content != contents[0] for content in contents):
+            raise CommandError(f'Рендереры вернули разный JSON для {name}.')
+        base_time = results['JSONRenderer'][0]
+        self.stdout.write(f'{name} ({len(data)} объектов):')
+        for renderer_name, (median, content) in results.items():
+            self.stdout.write(
+                f'  {renderer_name:<18} {median * 1000:8.2f} ms  '
+                f'{len(content) / 1024:8.1f} KiB  '
+                f'x{base_time / median:.1f}'
+            )
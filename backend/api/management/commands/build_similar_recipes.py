@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+from recipes.constants import (SIMILAR_RECIPES_COUNT,
+                               SIMILARITY_MAX_FEATURE_SHARE,
+                               SIMILARITY_MIN_FEATURE_LIMIT)
+from recipes.similarity import rebuild_similarities
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает похожие рецепты для всех рецептов по наборам '
+        'ингредиентов и тегов и сохраняет ближайших соседей '
+        'в RecipeSimilarity.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count', type=int, default=SIMILAR_RECIPES_COUNT,
+            help='Количество похожих рецептов на рецепт.'
+        )
+        parser.add_argument(
+            '--max-share', type=float, default=SIMILARITY_MAX_FEATURE_SHARE,
+            help='Доля рецептов, начиная с которой признак не используется '
+                 'для подбора кандидатов.'
+        )
+        parser.add_argument(
+            '--min-limit', type=int, default=SIMILARITY_MIN_FEATURE_LIMIT,
+            help='Количество рецептов, до которого признак используется '
+                 'для подбора кандидатов независимо от доли.'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        processed = rebuild_similarities(
+            count=options['count'],
+            max_share=options['max_share'],
+            min_limit=options['min_limit'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Похожие рецепты пересчитаны для {processed} рецептов '
+            f'за {time.perf_counter() - started:.1f} s.'
+        ))
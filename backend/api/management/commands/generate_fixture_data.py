@@ -0,0 +1,461 @@
+import csv
+import io
+import math
+import multiprocessing
+import os
+import random
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from recipes.models import (ChangeLog, Favorite, Ingredient, Recipe,
+                            RecipeIngredient, ShoppingCart, Tag)
+from recipes.signals import TRACKED_MODELS
+from users.models import MyUser, Subscription
+
+FIXTURE_EMAIL_DOMAIN = 'fixture.local'
+FIXTURE_TAG_PREFIX = 'fixture-tag-'
+FIXTURE_PASSWORD = 'fixture-password'
+BASE_DATE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+WORDS = (
+    'борщ', 'салат', 'пирог', 'суп', 'рагу', 'запеканка', 'паста', 'плов',
+    'котлеты', 'блины', 'омлет', 'каша', 'курица', 'говядина', 'рыба',
+    'овощи', 'грибы', 'сыр', 'томатный', 'сливочный', 'острый', 'домашний',
+    'быстрый', 'летний', 'зимний', 'праздничный', 'постный', 'сладкий',
+)
+BASE36 = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+# Состояние процесса-воркера, заполняется в init_worker.
+worker_plan = None
+worker_samplers = None
+
+
+class ZipfSampler:
+    """
+    Выборка индексов 0..size-1 с распределением Ципфа.
+    Ранги перемешиваются шагом, взаимно простым с size, чтобы популярные
+    объекты не совпадали с первыми созданными.
+    """
+    def __init__(self, size, exponent):
+        self.size = size
+        self.cumulative = list(accumulate(
+            1 / rank ** exponent for rank in range(1, size + 1)
+        ))
+        self.total = self.cumulative[-1]
+        self.stride = int(size * 0.618) | 1
+        while math.gcd(self.stride, size) != 1:
+            self.stride += 2
+
+    def sample(self, rng):
+        rank = bisect_left(self.cumulative, rng.random() * self.total)
+        return min(rank, self.size - 1) * self.stride % self.size
+
+    def sample_distinct(self, rng, count, exclude=None):
+        count = min(count, self.size - (exclude is not None))
+        chosen = set()
+        while len(chosen) < count:
+            index = self.sample(rng)
+            if index != exclude:
+                chosen.add(index)
+        return chosen
+
+
+def to_base36(number):
+    digits = ''
+    while True:
+        number, remainder = divmod(number, 36)
+        digits = BASE36[remainder] + digits
+        if not number:
+            return digits
+
+
+def around(rng, average):
+    """Случайное количество со средним average."""
+    return rng.randint(0, 2 * average) if average else 0
+
+
+def copy_value(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return (
+        str(value).replace('\\', '\\\\').replace('\t', '\\t')
+        .replace('\n', '\\n').replace('\r', '\\r')
+    )
+
+
+def write_rows(table, columns, rows):
+    """
+    Записывает строки в таблицу: через COPY для PostgreSQL
+    и через executemany для остальных баз.
+    """
+    if not rows:
+        return
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            buffer = io.StringIO()
+            for row in rows:
+                buffer.write('\t'.join(copy_value(value) for value in row))
+                buffer.write('\n')
+            buffer.seek(0)
+            cursor.cursor.copy_expert(
+                f'COPY {table} ({", ".join(columns)}) FROM STDIN', buffer
+            )
+        else:
+            placeholders = ', '.join(['%s'] * len(columns))
+            cursor.executemany(
+                f'INSERT INTO {table} ({", ".join(columns)}) '
+                f'VALUES ({placeholders})',
+                rows
+            )
+
+
+def table_columns(model, *fields):
+    return model._meta.db_table, [
+        model._meta.get_field(field).column for field in fields
+    ]
+
+
+def generate_users(plan, rng, start, stop):
+    rows = []
+    for index in range(start, stop):
+        user_id = plan['user_base'] + index + 1
+        rows.append((
+            user_id,
+            plan['password'],
+            False,
+            f'fixture_{user_id}',
+            False,
+            True,
+            BASE_DATE + timedelta(minutes=index),
+            rng.choice(('Анна', 'Иван', 'Мария', 'Олег', 'Елена', 'Павел')),
+            f'Фикстурный {index}',
+            f'user{user_id}@{FIXTURE_EMAIL_DOMAIN}',
+            'users/default.jpg',
+            1,
+            BASE_DATE + timedelta(minutes=index),
+        ))
+    write_rows(*table_columns(
+        MyUser, 'id', 'password', 'is_superuser', 'username', 'is_staff',
+        'is_active', 'date_joined', 'first_name', 'last_name', 'email',
+        'avatar', 'version', 'updated_at'
+    ), rows)
+    return len(rows)
+
+
+def generate_subscriptions(plan, rng, start, stop):
+    authors = worker_samplers['users']
+    rows = []
+    for index in range(start, stop):
+        count = around(rng, plan['subscriptions_per_user'])
+        for author in authors.sample_distinct(rng, count, exclude=index):
+            rows.append((
+                plan['user_base'] + index + 1,
+                plan['user_base'] + author + 1,
+            ))
+    write_rows(*table_columns(Subscription, 'user', 'author'), rows)
+    return len(rows)
+
+
+def generate_recipes(plan, rng, start, stop):
+    authors = worker_samplers['users']
+    rows = []
+    for index in range(start, stop):
+        recipe_id = plan['recipe_base'] + index + 1
+        name = ' '.join(rng.sample(WORDS, 3)).capitalize()
+        rows.append((
+            recipe_id,
+            plan['user_base'] + authors.sample(rng) + 1,
+            f'{name} {index}',
+            'recipes/images/fixture.png',
+            ' '.join(rng.choices(WORDS, k=rng.randint(20, 80))),
+            rng.randint(5, 240),
+            'z' + to_base36(recipe_id),
+            1,
+            BASE_DATE + timedelta(minutes=index),
+            0,
+        ))
+    write_rows(*table_columns(
+        Recipe, 'id', 'author', 'name', 'image', 'text', 'cooking_time',
+        'short_uuid', 'version', 'updated_at', 'favorites_count'
+    ), rows)
+    return len(rows)
+
+
+def generate_recipe_relations(plan, rng, start, stop):
+    ingredients = worker_samplers['ingredients']
+    tags = worker_samplers['tags']
+    ingredient_rows = []
+    tag_rows = []
+    for index in range(start, stop):
+        recipe_id = plan['recipe_base'] + index + 1
+        count = max(around(rng, plan['ingredients_per_recipe']), 1)
+        for ingredient in ingredients.sample_distinct(rng, count):
+            ingredient_rows.append((
+                recipe_id,
+                plan['ingredient_ids'][ingredient],
+                rng.randint(1, 1000),
+            ))
+        for tag in tags.sample_distinct(rng, rng.randint(1, 3)):
+            tag_rows.append((recipe_id, plan['tag_ids'][tag]))
+    write_rows(*table_columns(
+        RecipeIngredient, 'recipe', 'ingredient', 'amount'
+    ), ingredient_rows)
+    write_rows(
+        Recipe.tags.through._meta.db_table, ['recipe_id', 'tag_id'], tag_rows
+    )
+    return len(ingredient_rows) + len(tag_rows)
+
+
+def generate_user_recipes(model, per_user_option):
+    def generate(plan, rng, start, stop):
+        recipes = worker_samplers['recipes']
+        rows = []
+        for index in range(start, stop):
+            count = around(rng, plan[per_user_option])
+            for recipe in recipes.sample_distinct(rng, count):
+                rows.append((
+                    plan['user_base'] + index + 1,
+                    plan['recipe_base'] + recipe + 1,
+                ))
+        write_rows(*table_columns(model, 'user', 'recipe'), rows)
+        return len(rows)
+    return generate
+
+
+GENERATORS = {
+    'users': generate_users,
+    'subscriptions': generate_subscriptions,
+    'recipes': generate_recipes,
+    'recipe_relations': generate_recipe_relations,
+    'favorites': generate_user_recipes(Favorite, 'favorites_per_user'),
+    'shopping_cart': generate_user_recipes(ShoppingCart, 'cart_per_user'),
+}
+
+# Этапы загрузки: таблицы этапа зависят только от предыдущих этапов.
+PHASES = (
+    (('users', 'users'),),
+    (('subscriptions', 'users'), ('recipes', 'recipes')),
+    (
+        ('recipe_relations', 'recipes'),
+        ('favorites', 'users'),
+        ('shopping_cart', 'users'),
+    ),
+)
+
+
+def init_worker(plan):
+    global worker_plan, worker_samplers
+    if not apps.ready:
+        import django
+        django.setup()
+    worker_plan = plan
+    worker_samplers = {
+        'users': ZipfSampler(plan['users'], plan['exponent']),
+        'recipes': ZipfSampler(plan['recipes'], plan['exponent']),
+        'ingredients': ZipfSampler(
+            len(plan['ingredient_ids']), plan['exponent']
+        ),
+        'tags': ZipfSampler(len(plan['tag_ids']), plan['exponent']),
+    }
+
+
+def run_task(task):
+    kind, start, stop = task
+    rng = random.Random(f'{worker_plan["seed"]}-{kind}-{start}')
+    with transaction.atomic():
+        return kind, GENERATORS[kind](worker_plan, rng, start, stop)
+
+
+class Command(BaseCommand):
+    help = (
+        'Создает большой синтетический набор данных: пользователей, '
+        'подписки, рецепты, ингредиенты рецептов, теги, избранное и '
+        'корзины с распределением популярности по Ципфу. Данные '
+        'генерируются параллельно и загружаются через COPY в PostgreSQL; '
+        'результат воспроизводится по --seed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1_000_000)
+        parser.add_argument('--recipes', type=int, default=1_000_000)
+        parser.add_argument('--tags', type=int, default=30)
+        parser.add_argument('--subscriptions-per-user', type=int, default=10)
+        parser.add_argument('--ingredients-per-recipe', type=int, default=8)
+        parser.add_argument('--favorites-per-user', type=int, default=20)
+        parser.add_argument('--cart-per-user', type=int, default=5)
+        parser.add_argument(
+            '--zipf-exponent', type=float, default=1.1,
+            help='Показатель распределения популярности.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Количество процессов (для SQLite всегда 1).'
+        )
+        parser.add_argument('--chunk-size', type=int, default=20_000)
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['recipes'] < 1:
+            raise CommandError(
+                'Количество пользователей и рецептов должно быть больше 0.'
+            )
+        plan = self.build_plan(options)
+        workers = options['workers']
+        if connection.vendor != 'postgresql':
+            workers = 1
+        chunk_size = options['chunk_size']
+        connections.close_all()
+        context = multiprocessing.get_context()
+        with context.Pool(
+            workers, initializer=init_worker, initargs=(plan,)
+        ) as pool:
+            for phase in PHASES:
+                tasks = [
+                    (kind, start, min(start + chunk_size, plan[size]))
+                    for kind, size in phase
+                    for start in range(0, plan[size], chunk_size)
+                ]
+                started = time.perf_counter()
+                totals = dict.fromkeys((kind for kind, _ in phase), 0)
+                for kind, rows in pool.imap_unordered(run_task, tasks):
+                    totals[kind] += rows
+                elapsed = time.perf_counter() - started
+                for kind, rows in totals.items():
+                    self.stdout.write(f'{kind}: {rows} строк')
+                self.stdout.write(f'Этап завершен за {elapsed:.1f} с')
+        self.log_changes(plan)
+        self.count_favorites(plan)
+        self.finish()
+        self.stdout.write(self.style.SUCCESS('Данные сгенерированы.'))
+
+    def build_plan(self, options):
+        ingredient_ids = self.ensure_ingredients()
+        tag_ids = self.ensure_tags(options['tags'])
+        user_base = self.max_id(MyUser)
+        recipe_base = self.max_id(Recipe)
+        return {
+            'seed': options['seed'],
+            'exponent': options['zipf_exponent'],
+            'users': options['users'],
+            'recipes': options['recipes'],
+            'subscriptions_per_user': options['subscriptions_per_user'],
+            'ingredients_per_recipe': options['ingredients_per_recipe'],
+            'favorites_per_user': options['favorites_per_user'],
+            'cart_per_user': options['cart_per_user'],
+            'user_base': user_base,
+            'recipe_base': recipe_base,
+            'ingredient_ids': ingredient_ids,
+            'tag_ids': tag_ids,
+            'password': make_password(FIXTURE_PASSWORD),
+        }
+
+    def max_id(self, model):
+        return model.objects.order_by('-id').values_list(
+            'id', flat=True
+        ).first() or 0
+
+    def ensure_ingredients(self):
+        if not Ingredient.objects.exists():
+            path = settings.BASE_DIR.parent / 'data' / 'ingredients.csv'
+            if path.exists():
+                with open(path, encoding='utf-8') as file:
+                    Ingredient.objects.bulk_create(
+                        [
+                            Ingredient(name=name, measurement_unit=unit)
+                            for name, unit in csv.reader(file)
+                        ],
+                        ignore_conflicts=True
+                    )
+            else:
+                Ingredient.objects.bulk_create([
+                    Ingredient(
+                        name=f'ингредиент {i}',
+                        measurement_unit=('г', 'мл', 'шт.')[i % 3]
+                    )
+                    for i in range(2000)
+                ])
+        return list(
+            Ingredient.objects.order_by('id').values_list('id', flat=True)
+        )
+
+    def ensure_tags(self, count):
+        existing = set(Tag.objects.filter(
+            slug__startswith=FIXTURE_TAG_PREFIX
+        ).values_list('slug', flat=True))
+        Tag.objects.bulk_create([
+            Tag(name=f'Фикстурный тег {i}', slug=f'{FIXTURE_TAG_PREFIX}{i}')
+            for i in range(count)
+            if f'{FIXTURE_TAG_PREFIX}{i}' not in existing
+        ])
+        return list(Tag.objects.filter(
+            slug__startswith=FIXTURE_TAG_PREFIX
+        ).order_by('id').values_list('id', flat=True))
+
+    def log_changes(self, plan):
+        """
+        Записывает сгенерированные строки в журнал синхронизации:
+        COPY и executemany не отправляют сигналы post_save.
+        """
+        changelog = ChangeLog._meta.db_table
+        with connection.cursor() as cursor:
+            for model, resource, user_field, object_field in TRACKED_MODELS:
+                if user_field is None:
+                    filter_field, base = 'id', plan['recipe_base']
+                else:
+                    filter_field, base = user_field, plan['user_base']
+                columns = {
+                    name: model._meta.get_field(name).column
+                    for name in (filter_field, object_field)
+                }
+                user_column = (
+                    model._meta.get_field(user_field).column
+                    if user_field else 'NULL'
+                )
+                cursor.execute(
+                    f'INSERT INTO {changelog} '
+                    '(user_id, resource, object_id, action, created_at) '
+                    f'SELECT {user_column}, %s, {columns[object_field]}, '
+                    f'%s, %s FROM {model._meta.db_table} '
+                    f'WHERE {columns[filter_field]} > %s ORDER BY id',
+                    [resource, ChangeLog.UPSERT, BASE_DATE, base]
+                )
+
+    def count_favorites(self, plan):
+        """
+        Заполняет счетчики избранного у сгенерированных рецептов.
+        """
+        Recipe.objects.filter(id__gt=plan['recipe_base']).update(
+            favorites_count=Coalesce(Subquery(
+                Favorite.objects.filter(recipe=OuterRef('pk'))
+                .values('recipe')
+                .annotate(count=Count('pk'))
+                .values('count')
+            ), 0)
+        )
+
+    def finish(self):
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), [MyUser, Recipe]
+        )
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+            if connection.vendor == 'postgresql':
+                for model in (
+                    MyUser, Subscription, Recipe, RecipeIngredient,
+                    Recipe.tags.through, Favorite, ShoppingCart, ChangeLog
+                ):
+                    cursor.execute(f'ANALYZE {model._meta.db_table}')
@@ -0,0 +1,180 @@
+import importlib.util
+import os
+import subprocess
+import sys
+import sysconfig
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+IMPORT_SCRIPT = (
+    'import importlib, sys, django; '
+    'django.setup(); '
+    'importlib.import_module(sys.argv[1])'
+)
+
+
+def parse_importtime(output):
+    """
+    Разбирает вывод python -X importtime.
+    Возвращает список модулей в порядке вывода: имя, собственное
+    и накопленное время в микросекундах и имя импортировавшего модуля.
+    """
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_time, cumulative, name = (
+            line[len('import time:'):].split('|', 2)
+        )
+        if not self_time.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append({
+            'name': name.strip(),
+            'self': int(self_time),
+            'cumulative': int(cumulative),
+            'depth': depth,
+            'parent': None,
+        })
+    # Вложенные импорты выводятся перед импортировавшим их модулем.
+    stack = []
+    for entry in reversed(entries):
+        while stack and stack[-1]['depth'] >= entry['depth']:
+            stack.pop()
+        if stack:
+            entry['parent'] = stack[-1]['name']
+        stack.append(entry)
+    return entries
+
+
+def top_level(name):
+    return name.split('.', 1)[0]
+
+
+def is_stdlib(package):
+    """
+    Пакет из стандартной библиотеки: встроенный, замороженный или
+    расположенный в каталоге stdlib вне site-packages.
+    sys.stdlib_module_names появился только в Python 3.10.
+    """
+    if package in sys.builtin_module_names:
+        return True
+    try:
+        spec = importlib.util.find_spec(package)
+    except (ImportError, ValueError):
+        return False
+    if spec is None:
+        return False
+    if spec.origin in ('built-in', 'frozen'):
+        return True
+    location = spec.origin or next(
+        iter(spec.submodule_search_locations or ()), None
+    )
+    if location is None:
+        return False
+    location = os.path.realpath(location)
+    paths = sysconfig.get_paths()
+    return 'site-packages' not in location.split(os.sep) and any(
+        location.startswith(os.path.realpath(paths[key]) + os.sep)
+        for key in ('stdlib', 'platstdlib')
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет время импорта модулей при запуске приложения '
+        '(python -X importtime) и отмечает тяжелые сторонние пакеты, '
+        'которые стоит загружать лениво.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--module', default=settings.ROOT_URLCONF,
+            help='Модуль, импорт которого измеряется после django.setup().'
+        )
+        parser.add_argument(
+            '--limit', type=int, default=20,
+            help='Количество самых долгих модулей в отчете.'
+        )
+        parser.add_argument(
+            '--threshold', type=float, default=5,
+            help='Порог времени импорта пакета, ms.'
+        )
+
+    def handle(self, *args, **options):
+        result = subprocess.run(
+            (
+                sys.executable, '-X', 'importtime', '-c', IMPORT_SCRIPT,
+                options['module'],
+            ),
+            capture_output=True,
+            text=True,
+            cwd=settings.BASE_DIR,
+        )
+        if result.returncode:
+            raise CommandError(result.stderr.strip().splitlines()[-1])
+        entries = parse_importtime(result.stderr)
+        by_name = {entry['name']: entry for entry in entries}
+        total = sum(entry['self'] for entry in entries)
+        self.stdout.write(
+            f'Импорт {len(entries)} модулей: {total / 1000:.1f} ms\n'
+        )
+
+        self.stdout.write('Самые долгие модули (накопленное время):')
+        for entry in sorted(
+            entries, key=lambda entry: entry['cumulative'], reverse=True
+        )[:options['limit']]:
+            self.stdout.write(
+                f'  {entry["cumulative"] / 1000:8.1f} ms  {entry["name"]}'
+            )
+
+        packages = defaultdict(int)
+        for entry in entries:
+            packages[top_level(entry['name'])] += entry['self']
+        required = {'django', *(
+            top_level(app.name) for app in apps.get_app_configs()
+        )}
+        candidates = [
+            (package, package_time)
+            for package, package_time in packages.items()
+            if package_time >= options['threshold'] * 1000
+            and package not in required
+            and not is_stdlib(package)
+        ]
+        if not candidates:
+            return
+        self.stdout.write(
+            '\nСторонние пакеты вне INSTALLED_APPS, кандидаты '
+            'на ленивую загрузку:'
+        )
+        for package, package_time in sorted(
+            candidates, key=lambda item: item[1], reverse=True
+        ):
+            self.stdout.write(self.style.WARNING(
+                f'  {package_time / 1000:8.1f} ms  {package}'
+            ))
+            self.stdout.write(
+                f'              через {self._import_chain(package, by_name)}'
+            )
+
+    def _import_chain(self, package, by_name):
+        """
+        Цепочка модулей, через которую пакет был импортирован впервые.
+        """
+        entry = next(
+            (
+                entry for entry in by_name.values()
+                if top_level(entry['name']) == package
+                and entry['parent'] is not None
+                and top_level(entry['parent']) != package
+            ),
+            None
+        )
+        chain = []
+        while entry is not None and entry['parent'] is not None:
+            chain.append(entry['parent'])
+            entry = by_name.get(entry['parent'])
+        return ' <- '.join(chain) or '-'
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+from recipes.rollups import update_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает калорийность и стоимость всех рецептов '
+        'по калорийности и ценам ингредиентов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        processed = update_rollups(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Калорийность и стоимость пересчитаны для {processed} '
+            f'рецептов за {time.perf_counter() - started:.1f} s.'
+        ))
@@ -0,0 +1,27 @@
+from api.warmup import WARMUP_STEPS, warm_up
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогревает процесс перед приемом запросов: строит таблицы URL '
+        'и поля сериализаторов, открывает соединения с базой данных '
+        'и выполняет запросы тегов и ингредиентов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--step', action='append', dest='steps',
+            choices=[name for name, _ in WARMUP_STEPS],
+            help='Выполнить только указанный шаг (можно повторять).'
+        )
+
+    def handle(self, *args, **options):
+        timings = warm_up(options['steps'])
+        if options['verbosity'] < 1:
+            return
+        for name, duration in timings.items():
+            self.stdout.write(f'{name:<12} {duration * 1000:8.1f} ms')
+        self.stdout.write(self.style.SUCCESS(
+            f'Прогрев завершен за {sum(timings.values()) * 1000:.1f} ms.'
+        ))
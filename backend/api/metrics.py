@@ -0,0 +1,212 @@
+import threading
+import time
+from bisect import bisect_left
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    """
+    Гистограмма в формате Prometheus.
+    Хранит количество наблюдений по корзинам, их сумму и общее число.
+    """
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(
+                f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+            )
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f'{name}_sum{{{labels}}} {self.sum}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Реестр гистограмм процесса, сгруппированных по метрике и view.
+    """
+    metrics = (
+        (
+            'foodgram_request_duration_seconds',
+            'Общее время обработки запроса.',
+            DURATION_BUCKETS,
+        ),
+        (
+            'foodgram_db_duration_seconds',
+            'Время выполнения SQL-запросов.',
+            DURATION_BUCKETS,
+        ),
+        (
+            'foodgram_app_duration_seconds',
+            'Время работы view и сериализаторов без учета SQL.',
+            DURATION_BUCKETS,
+        ),
+        (
+            'foodgram_db_queries',
+            'Количество SQL-запросов на запрос.',
+            QUERY_COUNT_BUCKETS,
+        ),
+    )
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {name: {} for name, _, _ in self.metrics}
+        self.collectors = []
+
+    def observe(self, view, request_metrics):
+        values = {
+            'foodgram_request_duration_seconds': request_metrics.total_time,
+            'foodgram_db_duration_seconds': request_metrics.db_time,
+            'foodgram_app_duration_seconds': request_metrics.app_time,
+            'foodgram_db_queries': request_metrics.query_count,
+        }
+        with self.lock:
+            for name, _, buckets in self.metrics:
+                histogram = self.histograms[name].get(view)
+                if histogram is None:
+                    histogram = self.histograms[name][view] = Histogram(
+                        buckets
+                    )
+                histogram.observe(values[name])
+
+    def register_collector(self, collector):
+        """
+        Добавляет функцию, возвращающую дополнительные строки метрик.
+        """
+        self.collectors.append(collector)
+
+    def render(self):
+        lines = []
+        with self.lock:
+            for name, description, _ in self.metrics:
+                lines.append(f'# HELP {name} {description}')
+                lines.append(f'# TYPE {name} histogram')
+                for view, histogram in sorted(self.histograms[name].items()):
+                    lines.extend(histogram.render(name, f'view="{view}"'))
+        for collector in self.collectors:
+            lines.extend(collector())
+        return '\n'.join(lines) + '\n'
+
+
+POOL_METRICS = (
+    ('size', 'gauge', 'Размер пула соединений.'),
+    ('in_use', 'gauge', 'Соединения, выданные запросам.'),
+    ('idle', 'gauge', 'Свободные соединения в пуле.'),
+    ('overflow', 'gauge', 'Открытые соединения сверх размера пула.'),
+    ('checkouts', 'counter', 'Выдачи соединений из пула.'),
+    ('waits', 'counter', 'Ожидания свободного соединения.'),
+    ('wait_time', 'counter', 'Суммарное время ожидания соединения, с.'),
+    ('timeouts', 'counter', 'Превышения времени ожидания соединения.'),
+    ('discarded', 'counter', 'Закрытые неисправные и лишние соединения.'),
+)
+
+
+def connection_pool_metrics():
+    from backend.db.pool import pool_stats
+
+    stats = pool_stats()
+    lines = []
+    if not stats:
+        return lines
+    for key, metric_type, description in POOL_METRICS:
+        suffix = '_total' if metric_type == 'counter' else ''
+        name = f'foodgram_db_pool_{key}{suffix}'
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        for pool in stats:
+            lines.append(f'{name}{{alias="{pool["alias"]}"}} {pool[key]}')
+    return lines
+
+
+registry = MetricsRegistry()
+registry.register_collector(connection_pool_metrics)
+
+
+class RequestMetrics:
+    """
+    Метрики одного запроса: SQL-запросы, время БД, время view
+    и сериализаторов.
+    """
+    def __init__(self, capture_sql=False):
+        self.started = time.perf_counter()
+        self.view = None
+        self.query_count = 0
+        self.db_time = 0
+        self.app_time = 0
+        self.total_time = 0
+        self.capture_sql = capture_sql
+        self.queries = []
+        self._view_started = None
+        self._view_db_time = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.query_count += 1
+            self.db_time += duration
+            if self.capture_sql:
+                self.queries.append((duration, sql))
+
+    def start_view(self, view):
+        self.view = view
+        self._view_started = time.perf_counter()
+        self._view_db_time = self.db_time
+
+    def finish_view(self):
+        if self._view_started is None:
+            return
+        elapsed = time.perf_counter() - self._view_started
+        self.app_time = max(
+            elapsed - (self.db_time - self._view_db_time), 0
+        )
+
+    def finish(self):
+        self.total_time = time.perf_counter() - self.started
+
+    def server_timing(self):
+        return (
+            f'db;dur={self.db_time * 1000:.1f};'
+            f'desc="{self.query_count} queries", '
+            f'app;dur={self.app_time * 1000:.1f}, '
+            f'total;dur={self.total_time * 1000:.1f}'
+        )
+
+
+class MetricsMixin:
+    """
+    Миксин для DRF view.
+    Отмечает действие view и время работы обработчика и сериализаторов
+    для RequestMetricsMiddleware.
+    """
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        metrics = getattr(request._request, 'metrics', None)
+        if metrics is not None:
+            action = getattr(self, 'action', None) or request.method.lower()
+            metrics.start_view(f'{self.__class__.__name__}.{action}')
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        metrics = getattr(request._request, 'metrics', None)
+        if metrics is not None:
+            metrics.finish_view()
+        return super().finalize_response(request, response, *args, **kwargs)
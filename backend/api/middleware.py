@@ -0,0 +1,73 @@
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .metrics import RequestMetrics, registry
+
+logger = logging.getLogger('api.metrics')
+
+
+class RequestMetricsMiddleware:
+    """
+    Middleware для сбора метрик запросов.
+    Считает SQL-запросы и время их выполнения и сохраняет значения
+    в гистограммы для /api/metrics/. Заголовок Server-Timing добавляется
+    для персонала или для всех при SERVER_TIMING_ENABLED.
+    Медленные запросы записываются в лог вместе с выполненным SQL.
+    """
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_request_threshold = settings.SLOW_REQUEST_THRESHOLD_MS / 1000
+
+    def __call__(self, request):
+        metrics = RequestMetrics(capture_sql=bool(self.slow_request_threshold))
+        request.metrics = metrics
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+            response = self.get_response(request)
+        metrics.finish()
+        view = metrics.view or self._view_name(request)
+        registry.observe(view, metrics)
+        if self._show_server_timing(request):
+            response['Server-Timing'] = metrics.server_timing()
+        if (
+            self.slow_request_threshold
+            and metrics.total_time >= self.slow_request_threshold
+        ):
+            self._log_slow_request(request, view, metrics)
+        return response
+
+    def _show_server_timing(self, request):
+        if settings.SERVER_TIMING_ENABLED:
+            return True
+        user = getattr(request, 'user', None)
+        return user is not None and user.is_staff
+
+    def _view_name(self, request):
+        resolver_match = getattr(request, 'resolver_match', None)
+        if resolver_match is None:
+            return 'unresolved'
+        return resolver_match.view_name
+
+    def _log_slow_request(self, request, view, metrics):
+        queries = '\n'.join(
+            f'  {duration * 1000:.1f} ms: {sql}'
+            for duration, sql in metrics.queries
+        )
+        logger.warning(
+            'Медленный запрос %s %s (%s): %.1f ms, SQL: %d запросов '
+            'за %.1f ms\n%s',
+            request.method,
+            request.path,
+            view,
+            metrics.total_time * 1000,
+            metrics.query_count,
+            metrics.db_time * 1000,
+            queries,
+        )
@@ -0,0 +1,167 @@
+import hashlib
+
+from backend.db.router import (enable_replica_reads, is_pinned_to_primary,
+                               pin_to_primary, reset_replica_reads)
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.utils.cache import (get_conditional_response, patch_cache_control,
+                                patch_vary_headers)
+from django.utils.http import quote_etag
+from rest_framework import exceptions, permissions
+
+
+class ReplicaReadMixin:
+    """
+    Миксин для DRF view.
+    Выполняет действия из replica_actions на репликах базы данных.
+    После успешного изменяющего запроса чтения пользователя на время
+    REPLICA_PIN_SECONDS закрепляются за основной базой.
+    """
+    replica_actions = ('list', 'retrieve')
+    replica_token = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            request.method in permissions.SAFE_METHODS
+            and getattr(self, 'action', None) in self.replica_actions
+            and not is_pinned_to_primary(request.user)
+        ):
+            self.replica_token = enable_replica_reads()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if self.replica_token is not None:
+            reset_replica_reads(self.replica_token)
+            self.replica_token = None
+        if (
+            request.method not in permissions.SAFE_METHODS
+            and response.status_code < 400
+        ):
+            pin_to_primary(request.user)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class ConditionalGetMixin:
+    """
+    Миксин для DRF view.
+    Для действий из conditional_actions добавляет к ответу строгий ETag,
+    вычисленный из версий строк в базе данных (get_etag_version),
+    и отвечает 304 Not Modified до сериализации, если ETag совпал
+    с If-None-Match.
+    """
+    conditional_actions = ('list', 'retrieve')
+
+    def get_etag_version(self):
+        """
+        Версия данных ответа: количество строк и время последнего
+        изменения. Для retrieve учитывается только запрошенный объект.
+        """
+        queryset = self.get_queryset()
+        if self.action == 'retrieve':
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        return tuple(queryset.aggregate(
+            count=Count('pk'), updated_at=Max('updated_at')
+        ).values())
+
+    def get_etag(self, request):
+        if self.action not in self.conditional_actions:
+            return None
+        try:
+            version = self.get_etag_version()
+        except (TypeError, ValueError, ValidationError):
+            return None
+        if version is None:
+            return None
+        return quote_etag(hashlib.md5(
+            repr((version, request.accepted_media_type)).encode(),
+            usedforsecurity=False
+        ).hexdigest())
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        response = None
+        if etag is not None:
+            response = get_conditional_response(request._request, etag=etag)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if etag is not None and response.status_code in (200, 304):
+            response['ETag'] = etag
+            patch_cache_control(response, no_cache=True)
+            patch_vary_headers(response, ('Authorization',))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class SparseFieldsMixin:
+    """
+    Миксин для DRF view.
+    Для действий из sparse_actions поддерживает параметры запроса fields
+    (поля ответа через запятую) и expand (связи из expandable_fields,
+    которые возвращаются вложенными объектами, остальные связи
+    возвращаются идентификаторами). Без fields возвращаются все поля,
+    без expand все связи раскрыты. Выбранные поля передаются
+    сериализатору в контексте, по ним get_sparse_queryset загружает
+    только нужные столбцы и связи.
+    """
+    sparse_actions = ('list', 'retrieve')
+    sparse_fields = ()
+    expandable_fields = ()
+    sparse_selection = None
+
+    def parse_field_list(self, param, allowed):
+        value = self.request.query_params.get(param)
+        if value is None:
+            return None
+        names = {name.strip() for name in value.split(',') if name.strip()}
+        unknown = names.difference(allowed)
+        if unknown:
+            raise exceptions.ValidationError({param: (
+                f'Неизвестные поля: {", ".join(sorted(unknown))}. '
+                f'Допустимые поля: {", ".join(allowed)}.'
+            )})
+        return names
+
+    def get_sparse_selection(self):
+        """
+        Пара (поля, раскрытые связи); None — параметр не передан.
+        """
+        if self.sparse_selection is None:
+            if getattr(self, 'action', None) in self.sparse_actions:
+                self.sparse_selection = (
+                    self.parse_field_list('fields', self.sparse_fields),
+                    self.parse_field_list('expand', self.expandable_fields),
+                )
+            else:
+                self.sparse_selection = (None, None)
+        return self.sparse_selection
+
+    def get_sparse_queryset(self, queryset, fields, expand):
+        return queryset
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields, expand = self.get_sparse_selection()
+        if fields is None and expand is None:
+            return queryset
+        return self.get_sparse_queryset(
+            queryset,
+            self.sparse_fields if fields is None else fields,
+            self.expandable_fields if expand is None else expand,
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'], context['expand'] = self.get_sparse_selection()
+        return context
@@ -0,0 +1,36 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+encoder = JSONEncoder()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON-рендерер на основе orjson.
+    Если orjson не установлен или запрошен отступ, отличный от двух
+    пробелов, используется стандартный JSONRenderer.
+    Типы, которые orjson не поддерживает (Decimal, ленивые строки,
+    даты и время), преобразуются так же, как в DRF.
+    """
+    options = (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if orjson is not None else 0
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent not in (None, 2):
+            return super().render(data, accepted_media_type, renderer_context)
+        options = self.options
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=encoder.default, option=options)
@@ -1,11 +1,103 @@
-from api.fields import Base64ImageField
-from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
-                            ShoppingCart, Tag)
-from rest_framework import serializers
+from api.fields import (Base64ImageField, BulkPrimaryKeyRelatedField,
+                        resolve_pks)
+from django.db import models, transaction
+from django.db.models.functions import RowNumber
+from recipes.constants import ROLLUP_DECIMAL_PLACES, ROLLUP_MAX_DIGITS
+from recipes.models import (ChangeLog, Favorite, Ingredient, MealPlan, Recipe,
+                            RecipeIngredient, ShoppingCart, Tag,
+                            generate_short_uuid)
+from recipes.rollups import refresh_rollups, update_rollups
+from recipes.similarity import schedule_similarity_updates
+from rest_framework import serializers, status
 from rest_framework.exceptions import ValidationError
 from users.models import MyUser, Subscription
 
-from .constants import DEFAULT_RECIPES_LIMIT
+from .constants import (DEFAULT_RECIPES_LIMIT, MAX_BULK_RECIPES,
+                        MAX_MEAL_PLAN_DAYS)
+
+rollup_field = serializers.DecimalField(
+    max_digits=ROLLUP_MAX_DIGITS, decimal_places=ROLLUP_DECIMAL_PLACES
+)
+
+
+def file_url(file, request):
+    """
+    Ссылка на файл в том же виде, что у ImageField в DRF.
+    """
+    if not file:
+        return None
+    if request is not None:
+        return request.build_absolute_uri(file.url)
+    return file.url
+
+
+def user_representation(user, request, is_subscribed):
+    return {
+        'email': user.email,
+        'id': user.id,
+        'username': user.username,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'is_subscribed': is_subscribed,
+        'avatar': file_url(user.avatar, request),
+    }
+
+
+def rollup_representation(value):
+    """
+    Калорийность или стоимость рецепта в том же виде,
+    что у DecimalField модели в ModelSerializer.
+    """
+    if value is None:
+        return None
+    return rollup_field.to_representation(value)
+
+
+def is_response_root(serializer):
+    """
+    Сериализатор — корень ответа: без родителя
+    или элемент списочного сериализатора без родителя.
+    """
+    parent = serializer.parent
+    if isinstance(parent, serializers.ListSerializer):
+        parent = parent.parent
+    return parent is None
+
+
+def recipes_limit(request):
+    limit = request.query_params.get('recipes_limit')
+    if limit is not None and limit.isdigit():
+        return int(limit)
+    return DEFAULT_RECIPES_LIMIT
+
+
+class SparseFieldsSerializerMixin:
+    """
+    Миксин сериализатора для параметров fields и expand
+    (см. api.mixins.SparseFieldsMixin): оставляет поля
+    из context['fields'] и заменяет связи из collapsed_fields,
+    которых нет в context['expand'], полями с идентификаторами.
+    Применяется только к корню ответа, вложенные сериализаторы
+    возвращают все поля.
+    """
+    collapsed_fields = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not is_response_root(self):
+            return fields
+        requested = self.context.get('fields')
+        if requested is not None:
+            fields = {
+                name: field for name, field in fields.items()
+                if name in requested
+            }
+        expand = self.context.get('expand')
+        if expand is not None:
+            for name, collapsed_field in self.collapsed_fields.items():
+                if name in fields and name not in expand:
+                    fields[name] = collapsed_field()
+        return fields
 
 
 class RecipeShortSerializer(serializers.ModelSerializer):
@@ -45,7 +137,9 @@ class UserCreateSerializer(serializers.ModelSerializer):
         return user
 
 
-class UserListSerializer(serializers.ModelSerializer):
+class UserListSerializer(
+    SparseFieldsSerializerMixin, serializers.ModelSerializer
+):
     """
     Сериализатор для модели MyUser.
     Он используется для отображения информации о пользователе.
@@ -72,13 +166,7 @@ class UserListSerializer(serializers.ModelSerializer):
         return Subscription.objects.filter(user=user, author=obj).exists()
 
     def get_avatar(self, obj):
-        request = self.context.get('request')
-        if obj.avatar and hasattr(obj.avatar, 'url'):
-            url = obj.avatar.url
-            if request is not None:
-                return request.build_absolute_uri(url)
-            return url
-        return None
+        return file_url(obj.avatar, self.context.get('request'))
 
 
 class UserAvatarSerializer(serializers.ModelSerializer):
@@ -118,7 +206,107 @@ class IngredientInRecipeSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'measurement_unit', 'amount')
 
 
-class RecipeReadSerializer(serializers.ModelSerializer):
+class IngredientIdInRecipeSerializer(serializers.ModelSerializer):
+    """
+    Ингредиент рецепта без раскрытия: идентификатор и количество.
+    """
+    id = serializers.ReadOnlyField(source='ingredient_id')
+
+    class Meta:
+        model = RecipeIngredient
+        fields = ('id', 'amount')
+
+
+class RecipeReadListSerializer(serializers.ListSerializer):
+    """
+    Списочный сериализатор для RecipeReadSerializer.
+    Собирает словари ответа напрямую из объектов с предзагруженными
+    тегами, автором и ингредиентами, без создания полей DRF
+    для каждого рецепта. Флаги избранного, корзины и подписки
+    загружаются тремя запросами на всю страницу, и только если
+    эти поля есть в ответе.
+    Результат совпадает с RecipeReadSerializer для каждого рецепта.
+    """
+    def get_representers(self, recipes, fields, request):
+        expand = self.context.get('expand')
+        user = request.user
+        favorited = in_cart = subscribed = ()
+        if user.is_authenticated:
+            recipe_ids = [recipe.id for recipe in recipes]
+            if 'is_favorited' in fields:
+                favorited = set(Favorite.objects.filter(
+                    user=user, recipe_id__in=recipe_ids
+                ).values_list('recipe_id', flat=True))
+            if 'is_in_shopping_cart' in fields:
+                in_cart = set(ShoppingCart.objects.filter(
+                    user=user, recipe_id__in=recipe_ids
+                ).values_list('recipe_id', flat=True))
+            if 'author' in fields and (expand is None or 'author' in expand):
+                subscribed = set(Subscription.objects.filter(
+                    user=user,
+                    author_id__in={recipe.author_id for recipe in recipes}
+                ).values_list('author_id', flat=True))
+        representers = {
+            'id': lambda recipe: recipe.id,
+            'tags': lambda recipe: [
+                {'id': tag.id, 'name': tag.name, 'slug': tag.slug}
+                for tag in recipe.tags.all()
+            ],
+            'author': lambda recipe: user_representation(
+                recipe.author, request, recipe.author_id in subscribed
+            ),
+            'ingredients': lambda recipe: [
+                {
+                    'id': item.ingredient.id,
+                    'name': item.ingredient.name,
+                    'measurement_unit': item.ingredient.measurement_unit,
+                    'amount': item.amount,
+                }
+                for item in recipe.recipe_ingredients.all()
+            ],
+            'is_favorited': lambda recipe: recipe.id in favorited,
+            'is_in_shopping_cart': lambda recipe: recipe.id in in_cart,
+            'name': lambda recipe: recipe.name,
+            'image': lambda recipe: file_url(recipe.image, request),
+            'text': lambda recipe: recipe.text,
+            'cooking_time': lambda recipe: recipe.cooking_time,
+            'calories': lambda recipe: rollup_representation(
+                recipe.calories
+            ),
+            'cost': lambda recipe: rollup_representation(recipe.cost),
+        }
+        if expand is not None:
+            collapsed = {
+                'tags': lambda recipe: [tag.id for tag in recipe.tags.all()],
+                'author': lambda recipe: recipe.author_id,
+                'ingredients': lambda recipe: [
+                    {'id': item.ingredient_id, 'amount': item.amount}
+                    for item in recipe.recipe_ingredients.all()
+                ],
+            }
+            representers.update(
+                (name, representer)
+                for name, representer in collapsed.items()
+                if name not in expand
+            )
+        return [(name, representers[name]) for name in fields]
+
+    def to_representation(self, data):
+        if isinstance(data, models.Manager):
+            data = data.all()
+        recipes = list(data)
+        representers = self.get_representers(
+            recipes, self.child.fields, self.context.get('request')
+        )
+        return [
+            {name: representer(recipe) for name, representer in representers}
+            for recipe in recipes
+        ]
+
+
+class RecipeReadSerializer(
+    SparseFieldsSerializerMixin, serializers.ModelSerializer
+):
     """
     Сериализатор для модели Recipe.
     Он используется для отображения информации о рецепте.
@@ -146,7 +334,20 @@ class RecipeReadSerializer(serializers.ModelSerializer):
             'image',
             'text',
             'cooking_time',
+            'calories',
+            'cost',
         )
+        list_serializer_class = RecipeReadListSerializer
+
+    collapsed_fields = {
+        'tags': lambda: serializers.PrimaryKeyRelatedField(
+            many=True, read_only=True
+        ),
+        'author': lambda: serializers.PrimaryKeyRelatedField(read_only=True),
+        'ingredients': lambda: IngredientIdInRecipeSerializer(
+            source='recipe_ingredients', many=True, read_only=True
+        ),
+    }
 
     def get_is_favorited(self, obj):
         user = self.context.get('request').user
@@ -161,10 +362,31 @@ class RecipeReadSerializer(serializers.ModelSerializer):
         return ShoppingCart.objects.filter(user=user, recipe=obj).exists()
 
 
-class IngredientAmountSerializer(serializers.Serializer):
-    id = serializers.PrimaryKeyRelatedField(queryset=Ingredient.objects.all())
+class IngredientIdAmountSerializer(serializers.Serializer):
+    id = serializers.IntegerField(min_value=1)
     amount = serializers.IntegerField(min_value=1)
 
+
+class IngredientAmountListSerializer(serializers.ListSerializer):
+    """
+    Список ингредиентов рецепта.
+    Все ингредиенты получаются одним запросом после проверки списка.
+    """
+    def to_internal_value(self, data):
+        value = super().to_internal_value(data)
+        ingredients = resolve_pks(
+            Ingredient.objects.all(),
+            [item['id'] for item in value]
+        )
+        for item, ingredient in zip(value, ingredients):
+            item['id'] = ingredient
+        return value
+
+
+class IngredientAmountSerializer(IngredientIdAmountSerializer):
+    class Meta:
+        list_serializer_class = IngredientAmountListSerializer
+
     def validate_amount(self, value):
         if value <= 0:
             raise serializers.ValidationError(
@@ -180,9 +402,8 @@ class RecipeSerializer(serializers.ModelSerializer):
     Он также включает в себя валидацию ингредиентов и тегов.
     """
     ingredients = IngredientAmountSerializer(many=True, write_only=True)
-    tags = serializers.PrimaryKeyRelatedField(
+    tags = BulkPrimaryKeyRelatedField(
         queryset=Tag.objects.all(),
-        many=True,
         write_only=True
     )
     image = Base64ImageField()
@@ -216,6 +437,7 @@ class RecipeSerializer(serializers.ModelSerializer):
         ]
         RecipeIngredient.objects.bulk_create(ingredient_objs)
 
+    @transaction.atomic
     def create(self, validated_data):
         ingredients_data = validated_data.pop('ingredients')
         tags = validated_data.pop('tags')
@@ -223,17 +445,70 @@ class RecipeSerializer(serializers.ModelSerializer):
         recipe = Recipe.objects.create(**validated_data)
         recipe.tags.set(tags)
         self._create_ingredients(ingredients_data, recipe)
+        refresh_rollups(recipe)
         return recipe
 
+    def _update_tags(self, tags, recipe):
+        current_ids = {tag.id for tag in recipe.tags.all()}
+        new_ids = {tag.id for tag in tags}
+        if current_ids - new_ids:
+            recipe.tags.remove(*(current_ids - new_ids))
+        if new_ids - current_ids:
+            recipe.tags.add(*(new_ids - current_ids))
+        return current_ids != new_ids
+
+    def _update_ingredients(self, ingredients_data, recipe):
+        current = {
+            recipe_ingredient.ingredient_id: recipe_ingredient
+            for recipe_ingredient in recipe.recipe_ingredients.all()
+        }
+        to_create = []
+        to_update = []
+        for ingredient in ingredients_data:
+            recipe_ingredient = current.pop(ingredient['id'].id, None)
+            if recipe_ingredient is None:
+                to_create.append(ingredient)
+            elif recipe_ingredient.amount != ingredient['amount']:
+                recipe_ingredient.amount = ingredient['amount']
+                to_update.append(recipe_ingredient)
+        if current:
+            RecipeIngredient.objects.filter(
+                id__in=[
+                    recipe_ingredient.id
+                    for recipe_ingredient in current.values()
+                ]
+            ).delete()
+        if to_update:
+            RecipeIngredient.objects.bulk_update(to_update, ('amount',))
+        if to_create:
+            self._create_ingredients(to_create, recipe)
+        return bool(current or to_update or to_create)
+
+    @transaction.atomic
     def update(self, instance, validated_data):
         ingredients_data = validated_data.pop('ingredients', None)
         tags = validated_data.pop('tags', None)
-        instance = super().update(instance, validated_data)
-        if tags is not None:
-            instance.tags.set(tags)
-        if ingredients_data is not None:
-            instance.ingredients.clear()
-            self._create_ingredients(ingredients_data, instance)
+        changed_fields = [
+            field for field, value in validated_data.items()
+            if getattr(instance, field) != value
+        ]
+        for field in changed_fields:
+            setattr(instance, field, validated_data[field])
+        tags_changed = (
+            tags is not None and self._update_tags(tags, instance)
+        )
+        ingredients_changed = (
+            ingredients_data is not None
+            and self._update_ingredients(ingredients_data, instance)
+        )
+        if ingredients_changed:
+            refresh_rollups(instance)
+        if changed_fields or tags_changed or ingredients_changed:
+            # Версия рецепта растет и при изменении только тегов или
+            # ингредиентов: с пустым update_fields VersionedModel
+            # сохраняет только версию и время изменения. От версии
+            # зависят ETag и синхронизация клиентов.
+            instance.save(update_fields=changed_fields)
         return instance
 
     def validate_cooking_time(self, value):
@@ -252,7 +527,7 @@ class RecipeSerializer(serializers.ModelSerializer):
             )
         seen_ids = set()
         for ingredient in value:
-            ingredient_id = ingredient['id']
+            ingredient_id = ingredient['id'].id
             if ingredient_id in seen_ids:
                 raise ValidationError({
                     'ingredients': (
@@ -301,6 +576,177 @@ class RecipeSerializer(serializers.ModelSerializer):
         ).data
 
 
+class RecipeBulkItemSerializer(RecipeSerializer):
+    """
+    Сериализатор одного рецепта в пакетной загрузке.
+    Ингредиенты и теги принимаются как идентификаторы, которые
+    проверяются сразу для всего пакета в RecipeBulkSerializer.
+    """
+    ingredients = IngredientIdAmountSerializer(many=True, write_only=True)
+    tags = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        write_only=True
+    )
+
+    def validate_ingredients(self, value):
+        if not value:
+            raise ValidationError(
+                {'ingredients': 'Список ингредиентов не может быть пустым.'}
+            )
+        ingredient_ids = [ingredient['id'] for ingredient in value]
+        if len(set(ingredient_ids)) != len(ingredient_ids):
+            raise ValidationError(
+                {'ingredients': 'Ингредиенты не должны повторяться.'}
+            )
+        return value
+
+    def validate_tags(self, value):
+        if not value:
+            raise ValidationError(
+                {'tags': 'Список тегов не может быть пустым.'}
+            )
+        if len(set(value)) != len(value):
+            raise ValidationError(
+                {'tags': 'Теги не должны повторяться.'}
+            )
+        return value
+
+
+class RecipeBulkSerializer(serializers.BaseSerializer):
+    """
+    Сериализатор для пакетного создания рецептов.
+    Принимает список рецептов, проверяет каждый из них, получает все
+    ингредиенты и теги двумя запросами и сохраняет корректные рецепты
+    несколькими bulk_create в одной транзакции.
+    Возвращает результат для каждого элемента списка.
+    """
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            raise ValidationError(
+                {'non_field_errors': 'Ожидается список рецептов.'}
+            )
+        if not data:
+            raise ValidationError(
+                {'non_field_errors': 'Список рецептов не может быть пустым.'}
+            )
+        if len(data) > MAX_BULK_RECIPES:
+            raise ValidationError({
+                'non_field_errors': (
+                    f'Нельзя загрузить больше {MAX_BULK_RECIPES} '
+                    'рецептов за один запрос.'
+                )
+            })
+        items = []
+        for item in data:
+            serializer = RecipeBulkItemSerializer(
+                data=item,
+                context=self.context
+            )
+            if serializer.is_valid():
+                items.append({'data': serializer.validated_data})
+            else:
+                items.append({'errors': serializer.errors})
+        valid_items = [item['data'] for item in items if 'data' in item]
+        ingredients = Ingredient.objects.in_bulk({
+            ingredient['id']
+            for item in valid_items
+            for ingredient in item['ingredients']
+        })
+        tags = Tag.objects.in_bulk({
+            tag_id for item in valid_items for tag_id in item['tags']
+        })
+        for item in items:
+            if 'data' in item:
+                errors = self._resolve(item['data'], ingredients, tags)
+                if errors:
+                    item['errors'] = errors
+                    del item['data']
+        return {'items': items}
+
+    def _resolve(self, data, ingredients, tags):
+        errors = {}
+        missing_ingredients = [
+            ingredient['id'] for ingredient in data['ingredients']
+            if ingredient['id'] not in ingredients
+        ]
+        if missing_ingredients:
+            errors['ingredients'] = [
+                f'Ингредиенты с id {missing_ingredients} не найдены.'
+            ]
+        missing_tags = [
+            tag_id for tag_id in data['tags'] if tag_id not in tags
+        ]
+        if missing_tags:
+            errors['tags'] = [f'Теги с id {missing_tags} не найдены.']
+        if errors:
+            return errors
+        for ingredient in data['ingredients']:
+            ingredient['id'] = ingredients[ingredient['id']]
+        data['tags'] = [tags[tag_id] for tag_id in data['tags']]
+        return None
+
+    @transaction.atomic
+    def create(self, validated_data):
+        author = self.context['request'].user
+        items = validated_data['items']
+        valid_items = [item for item in items if 'data' in item]
+        recipes = Recipe.objects.bulk_create([
+            Recipe(
+                author=author,
+                short_uuid=generate_short_uuid(),
+                name=item['data']['name'],
+                image=item['data']['image'],
+                text=item['data']['text'],
+                cooking_time=item['data']['cooking_time'],
+            )
+            for item in valid_items
+        ])
+        RecipeIngredient.objects.bulk_create([
+            RecipeIngredient(
+                recipe=recipe,
+                ingredient=ingredient['id'],
+                amount=ingredient['amount']
+            )
+            for recipe, item in zip(recipes, valid_items)
+            for ingredient in item['data']['ingredients']
+        ])
+        Recipe.tags.through.objects.bulk_create([
+            Recipe.tags.through(recipe=recipe, tag=tag)
+            for recipe, item in zip(recipes, valid_items)
+            for tag in item['data']['tags']
+        ])
+        # bulk_create не отправляет post_save, поэтому рецепты
+        # записываются в журнал синхронизации явно.
+        ChangeLog.objects.bulk_create([
+            ChangeLog(
+                resource=ChangeLog.RECIPE,
+                object_id=recipe.id,
+                action=ChangeLog.UPSERT
+            )
+            for recipe in recipes
+        ])
+        update_rollups([recipe.id for recipe in recipes])
+        schedule_similarity_updates(recipe.id for recipe in recipes)
+        for recipe, item in zip(recipes, valid_items):
+            item['recipe'] = recipe
+        return items
+
+    def to_representation(self, instance):
+        results = []
+        for item in instance:
+            if 'recipe' in item:
+                results.append({
+                    'status': status.HTTP_201_CREATED,
+                    'id': item['recipe'].id
+                })
+            else:
+                results.append({
+                    'status': status.HTTP_400_BAD_REQUEST,
+                    'errors': item['errors']
+                })
+        return results
+
+
 class ShoppingCartSerializer(serializers.ModelSerializer):
     """
     Сериализатор для модели ShoppingCart.
@@ -331,6 +777,98 @@ class FavoriteSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'image', 'cooking_time')
 
 
+class MealPlanSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор для модели MealPlan.
+    Запись плана создается для текущего пользователя.
+    """
+    user = serializers.HiddenField(default=serializers.CurrentUserDefault())
+
+    class Meta:
+        model = MealPlan
+        fields = ('id', 'user', 'recipe', 'date', 'servings')
+
+
+class MealPlanRangeSerializer(serializers.Serializer):
+    """
+    Период плана питания для подсчета ингредиентов.
+    """
+    start = serializers.DateField()
+    end = serializers.DateField()
+
+    def validate(self, data):
+        days = (data['end'] - data['start']).days
+        if days < 0:
+            raise ValidationError(
+                {'end': 'Дата окончания раньше даты начала.'}
+            )
+        if days >= MAX_MEAL_PLAN_DAYS:
+            raise ValidationError(
+                {'end': f'Период не может быть длиннее '
+                        f'{MAX_MEAL_PLAN_DAYS} дней.'}
+            )
+        return data
+
+
+class SubscriptionListSerializer(serializers.ListSerializer):
+    """
+    Списочный сериализатор для SubscriptionSerializer.
+    Рецепты всех авторов страницы загружаются одним запросом
+    с ограничением recipes_limit на автора через оконную функцию,
+    количество рецептов — одним агрегирующим запросом.
+    """
+    def to_representation(self, data):
+        if isinstance(data, models.Manager):
+            data = data.all()
+        subscriptions = list(data)
+        request = self.context.get('request')
+        author_ids = [
+            subscription.author_id for subscription in subscriptions
+        ]
+        recipes = {author_id: [] for author_id in author_ids}
+        image_storage = Recipe._meta.get_field('image').storage
+        for recipe in (
+            Recipe.objects
+            .filter(author_id__in=author_ids)
+            .annotate(position=models.Window(
+                RowNumber(),
+                partition_by=models.F('author_id'),
+                order_by=Recipe._meta.ordering,
+            ))
+            .filter(position__lte=recipes_limit(request))
+            .order_by('author_id', 'position')
+            .values('id', 'name', 'image', 'cooking_time', 'author_id')
+        ):
+            image = recipe['image']
+            if image:
+                image = image_storage.url(image)
+                if request is not None:
+                    image = request.build_absolute_uri(image)
+            recipes[recipe['author_id']].append({
+                'id': recipe['id'],
+                'name': recipe['name'],
+                'image': image or None,
+                'cooking_time': recipe['cooking_time'],
+            })
+        recipes_count = dict(
+            Recipe.objects
+            .filter(author_id__in=author_ids)
+            .values('author_id')
+            .annotate(count=models.Count('id'))
+            .values_list('author_id', 'count')
+        )
+        result = []
+        for subscription in subscriptions:
+            author = subscription.author
+            representation = user_representation(author, request, True)
+            avatar = representation.pop('avatar')
+            representation['recipes'] = recipes[author.id]
+            representation['recipes_count'] = recipes_count.get(author.id, 0)
+            representation['avatar'] = avatar
+            result.append(representation)
+        return result
+
+
 class SubscriptionSerializer(serializers.ModelSerializer):
     """
     Сериализатор для модели Subscription.
@@ -368,6 +906,7 @@ class SubscriptionSerializer(serializers.ModelSerializer):
             'recipes_count',
             'avatar',
         )
+        list_serializer_class = SubscriptionListSerializer
 
     def get_recipes_count(self, obj):
         return obj.author.recipes.count()
@@ -398,3 +937,12 @@ class IngredientSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ingredient
         fields = ('id', 'name', 'measurement_unit')
+
+
+class IngredientCompactSerializer(serializers.BaseSerializer):
+    """
+    Сериализатор ингредиента в компактном виде:
+    список [id, name, measurement_unit] вместо объекта.
+    """
+    def to_representation(self, instance):
+        return [instance.id, instance.name, instance.measurement_unit]
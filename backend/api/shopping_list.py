@@ -0,0 +1,120 @@
+import hashlib
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db.models import Count, F, Max, Sum
+from django.http import StreamingHttpResponse
+from recipes.constants import UNIT_CONVERSIONS
+from recipes.models import Ingredient, MealPlan
+
+from .constants import MEAL_PLAN_CACHE_SECONDS
+
+
+def normalize_units(ingredients):
+    """
+    Объединяет строки (название, единица, количество) с одинаковым
+    названием и эквивалентными единицами в канонической единице
+    (UNIT_CONVERSIONS). Возвращает пары ((название, единица), количество),
+    отсортированные по названию.
+    """
+    totals = defaultdict(int)
+    for name, unit, amount in ingredients:
+        unit, factor = UNIT_CONVERSIONS.get(unit, (unit, 1))
+        totals[name, unit] += amount * factor
+    return sorted(totals.items())
+
+
+def shopping_list(user):
+    """
+    Ингредиенты из списка покупок пользователя.
+    Количества суммируются в базе данных по ingredient_id.
+    """
+    return normalize_units(
+        Ingredient.objects
+        .filter(recipeingredient__recipe__in_cart__user=user)
+        .annotate(amount=Sum('recipeingredient__amount'))
+        .values_list('name', 'measurement_unit', 'amount')
+        .order_by()
+    )
+
+
+def meal_plan_list(user, start, end):
+    """
+    Ингредиенты рецептов из плана питания пользователя за период
+    с учетом порций. Количества суммируются одним запросом
+    с группировкой по ingredient_id.
+    """
+    meal_plans = 'recipeingredient__recipe__meal_plans'
+    return normalize_units(
+        Ingredient.objects
+        .filter(**{
+            f'{meal_plans}__user': user,
+            f'{meal_plans}__date__range': (start, end),
+        })
+        .annotate(amount=Sum(
+            F('recipeingredient__amount') * F(f'{meal_plans}__servings')
+        ))
+        .values_list('name', 'measurement_unit', 'amount')
+        .order_by()
+    )
+
+
+def meal_plan_version(user, start, end):
+    """
+    Версия плана за период: количество записей, время последнего
+    изменения записи, сумма версий рецептов и время последнего
+    изменения их ингредиентов. Меняется при изменении плана,
+    ингредиентов и их количества в запланированных рецептах
+    и названий или единиц измерения ингредиентов.
+    """
+    meal_plans = MealPlan.objects.filter(
+        user=user, date__range=(start, end)
+    )
+    return (
+        *meal_plans.aggregate(
+            count=Count('pk'),
+            updated_at=Max('updated_at'),
+            recipes_version=Sum('recipe__version'),
+        ).values(),
+        Ingredient.objects.filter(
+            recipes__meal_plans__in=meal_plans
+        ).aggregate(updated_at=Max('updated_at'))['updated_at'],
+    )
+
+
+def cached_meal_plan_list(user, start, end):
+    """
+    meal_plan_list, закэшированный по версии плана за период.
+    """
+    version = hashlib.md5(
+        repr(meal_plan_version(user, start, end)).encode(),
+        usedforsecurity=False
+    ).hexdigest()
+    key = f'meal-plan:{user.pk}:{start}:{end}:{version}'
+    items = cache.get(key)
+    if items is None:
+        items = meal_plan_list(user, start, end)
+        cache.set(key, items, MEAL_PLAN_CACHE_SECONDS)
+    return items
+
+
+def shopping_list_lines(items):
+    separator = ''
+    for (name, unit), amount in items:
+        yield (
+            f'{separator}{name}. Единица измерения: {unit}, '
+            f'количество: {amount}.'
+        )
+        separator = '\n'
+
+
+def shopping_list_response(items, filename):
+    """
+    Текстовый файл списка покупок, который отдается построчно.
+    """
+    response = StreamingHttpResponse(
+        shopping_list_lines(items),
+        content_type='text/plain; charset=utf-8'
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
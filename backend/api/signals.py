@@ -0,0 +1,28 @@
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache
+
+
+def invalidate_token(sender, instance, **kwargs):
+    # После фиксации транзакции, чтобы параллельный запрос не загрузил
+    # из базы прежнее состояние с уже новой версией.
+    transaction.on_commit(partial(token_cache.invalidate, [instance.key]))
+
+
+def invalidate_user(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    transaction.on_commit(partial(token_cache.invalidate_user, instance.pk))
+
+
+def connect_signals():
+    post_delete.connect(invalidate_token, sender=Token)
+    post_save.connect(invalidate_token, sender=Token)
+    user_model = get_user_model()
+    post_save.connect(invalidate_user, sender=user_model)
+    post_delete.connect(invalidate_user, sender=user_model)
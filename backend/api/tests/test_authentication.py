@@ -0,0 +1,58 @@
+from unittest import mock
+
+from api.authentication import TokenUserCache
+from django.contrib.auth.models import update_last_login
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from .utils import create_user
+
+
+class TokenUserCacheTests(TestCase):
+    """
+    Два экземпляра кэша с общим кэшем Django моделируют два воркера:
+    изменение, обработанное одним воркером, сбрасывает запись другого.
+    """
+    def setUp(self):
+        cache.clear()
+        self.user = create_user('user')
+        self.token = Token.objects.create(user=self.user)
+        self.worker = TokenUserCache(60, 100, cache)
+        self.other_worker = TokenUserCache(60, 100, cache)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        for target in ('api.authentication', 'api.signals'):
+            patcher = mock.patch(f'{target}.token_cache', self.worker)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def cache_in_other_worker(self):
+        key = self.token.key
+        self.other_worker.set(
+            key, self.user, self.token, self.other_worker.get_version(key)
+        )
+        self.assertIsNotNone(self.other_worker.get(key))
+
+    def test_logout_invalidates_other_workers(self):
+        self.assertEqual(self.client.get('/api/users/me/').status_code, 200)
+        self.cache_in_other_worker()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token.delete()
+        self.assertIsNone(self.other_worker.get(self.token.key))
+        self.assertEqual(self.client.get('/api/users/me/').status_code, 401)
+
+    def test_user_change_invalidates_other_workers(self):
+        self.cache_in_other_worker()
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertIsNone(self.other_worker.get(self.token.key))
+        self.assertEqual(self.client.get('/api/users/me/').status_code, 401)
+
+    def test_login_keeps_cached_tokens(self):
+        self.cache_in_other_worker()
+        with self.captureOnCommitCallbacks(execute=True):
+            update_last_login(None, self.user)
+        self.assertIsNotNone(self.other_worker.get(self.token.key))
@@ -0,0 +1,82 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from recipes.models import Recipe
+from rest_framework.test import APIClient
+
+from .utils import PNG_IMAGE, create_ingredients, create_tags, create_user
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class RecipeBulkTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user('author')
+        cls.tags = create_tags(1)
+        cls.ingredients = create_ingredients(2)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def item(self, **fields):
+        return {
+            'name': 'Рецепт',
+            'text': 'Описание',
+            'cooking_time': 10,
+            'image': PNG_IMAGE,
+            'tags': [tag.id for tag in self.tags],
+            'ingredients': [
+                {'id': ingredient.id, 'amount': 1}
+                for ingredient in self.ingredients
+            ],
+            **fields,
+        }
+
+    def post(self, items):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                '/api/recipes/bulk/', items, format='json'
+            )
+
+    def test_partial_errors_return_207_with_item_errors(self):
+        missing_id = self.ingredients[-1].id + 1
+        response = self.post([
+            self.item(cooking_time=0),
+            self.item(),
+            self.item(ingredients=[{'id': missing_id, 'amount': 1}]),
+            self.item(name='Второй рецепт'),
+        ])
+        self.assertEqual(response.status_code, 207)
+        results = response.json()
+        self.assertEqual(
+            [result['status'] for result in results], [400, 201, 400, 201]
+        )
+        self.assertIn('cooking_time', results[0]['errors'])
+        self.assertIn('ingredients', results[2]['errors'])
+        for result in results[1::2]:
+            self.assertNotIn('errors', result)
+        self.assertEqual(
+            set(Recipe.objects.values_list('id', flat=True)),
+            {results[1]['id'], results[3]['id']},
+        )
+
+    def test_all_invalid_items_return_400(self):
+        response = self.post([
+            self.item(tags=[]),
+            self.item(ingredients=[]),
+        ])
+        self.assertEqual(response.status_code, 400)
+        first, second = response.json()
+        self.assertEqual(first['status'], 400)
+        self.assertIn('tags', first['errors'])
+        self.assertEqual(second['status'], 400)
+        self.assertIn('ingredients', second['errors'])
+        self.assertFalse(Recipe.objects.exists())
@@ -0,0 +1,56 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .utils import create_ingredients, create_recipe, create_tags, create_user
+
+
+class RecipeETagTests(TestCase):
+    """
+    ETag карточки рецепта меняется при изменении только тегов
+    или количества ингредиентов.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user('author')
+        cls.tags = create_tags(3)
+        cls.ingredients = create_ingredients(2)
+        # Самый новый тег остается у рецепта после замены тегов.
+        cls.recipe = create_recipe(
+            cls.author, [cls.tags[0], cls.tags[2]], cls.ingredients
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+        self.url = f'/api/recipes/{self.recipe.pk}/'
+
+    def assert_etag_changes(self, data):
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code,
+            304
+        )
+        response = self.client.patch(self.url, data, format='json')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        return response.json()
+
+    def test_tag_swap_changes_etag(self):
+        recipe = self.assert_etag_changes(
+            {'tags': [self.tags[1].id, self.tags[2].id]}
+        )
+        self.assertEqual(
+            [tag['id'] for tag in recipe['tags']],
+            [self.tags[1].id, self.tags[2].id]
+        )
+
+    def test_amount_change_changes_etag(self):
+        recipe = self.assert_etag_changes({'ingredients': [
+            {'id': ingredient.id, 'amount': 5}
+            for ingredient in self.ingredients
+        ]})
+        self.assertEqual(
+            [item['amount'] for item in recipe['ingredients']], [5, 5]
+        )
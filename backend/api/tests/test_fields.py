@@ -0,0 +1,77 @@
+import shutil
+import tempfile
+
+from api.fields import resolve_pks
+from django.conf import settings
+from django.test import TestCase, override_settings
+from recipes.models import Ingredient, Recipe
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from .utils import PNG_IMAGE, create_ingredients, create_tags, create_user
+
+
+class ResolvePksTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ingredients = create_ingredients(3)
+
+    def test_objects_are_returned_in_key_order(self):
+        pks = [ingredient.pk for ingredient in reversed(self.ingredients)]
+        with self.assertNumQueries(1):
+            objects = resolve_pks(Ingredient.objects.all(), pks)
+        self.assertEqual(objects, self.ingredients[::-1])
+
+    def test_unknown_pks_raise_validation_error(self):
+        missing = [self.ingredients[-1].pk + 1, self.ingredients[-1].pk + 2]
+        with self.assertRaises(ValidationError) as context:
+            resolve_pks(
+                Ingredient.objects.all(), [self.ingredients[0].pk, *missing]
+            )
+        self.assertIn(str(missing), str(context.exception.detail[0]))
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class RecipeUnknownPksTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user('author')
+        cls.tags = create_tags(1)
+        cls.ingredients = create_ingredients(1)
+
+    def post(self, tags, ingredients):
+        client = APIClient()
+        client.force_authenticate(self.author)
+        return client.post('/api/recipes/', {
+            'name': 'Рецепт',
+            'text': 'Описание',
+            'cooking_time': 10,
+            'image': PNG_IMAGE,
+            'tags': tags,
+            'ingredients': [
+                {'id': pk, 'amount': 1} for pk in ingredients
+            ],
+        }, format='json')
+
+    def test_unknown_tag_returns_400(self):
+        missing = self.tags[0].pk + 1
+        response = self.post(
+            [self.tags[0].pk, missing], [self.ingredients[0].pk]
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str(missing), str(response.json()['tags']))
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_unknown_ingredient_returns_400(self):
+        missing = self.ingredients[0].pk + 1
+        response = self.post(
+            [self.tags[0].pk], [self.ingredients[0].pk, missing]
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str(missing), str(response.json()['ingredients']))
+        self.assertFalse(Recipe.objects.exists())
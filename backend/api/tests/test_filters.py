@@ -0,0 +1,91 @@
+from decimal import Decimal
+
+from django.test import TestCase
+from recipes.models import Recipe
+from rest_framework.test import APIClient
+
+from .utils import create_recipe, create_user
+
+
+class RecipeOrderingAndFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = create_user('author')
+        cls.recipes = {
+            name: create_recipe(author, name=name, cooking_time=cooking_time)
+            for name, cooking_time in (
+                ('Борщ', 60), ('Омлет', 10), ('Каша', 20), ('Салат', 10),
+            )
+        }
+        for name, calories, cost, favorites_count in (
+            ('Борщ', '300', '250', 1),
+            ('Омлет', '150', None, 3),
+            ('Каша', None, '40', 0),
+            ('Салат', '80', '120', 3),
+        ):
+            Recipe.objects.filter(pk=cls.recipes[name].pk).update(
+                calories=calories and Decimal(calories),
+                cost=cost and Decimal(cost),
+                favorites_count=favorites_count,
+            )
+
+    def names(self, **params):
+        response = APIClient().get(
+            '/api/recipes/', {'limit': len(self.recipes), **params}
+        )
+        self.assertEqual(response.status_code, 200)
+        return [item['name'] for item in response.json()['results']]
+
+    def test_ordering(self):
+        cases = {
+            'name': ['Борщ', 'Каша', 'Омлет', 'Салат'],
+            '-name': ['Салат', 'Омлет', 'Каша', 'Борщ'],
+            'cooking_time': ['Омлет', 'Салат', 'Каша', 'Борщ'],
+            '-cooking_time': ['Борщ', 'Каша', 'Салат', 'Омлет'],
+            'popularity': ['Салат', 'Омлет', 'Борщ', 'Каша'],
+            'newest': ['Салат', 'Каша', 'Омлет', 'Борщ'],
+            'calories': ['Салат', 'Омлет', 'Борщ', 'Каша'],
+            '-calories': ['Борщ', 'Омлет', 'Салат', 'Каша'],
+            'cost': ['Каша', 'Салат', 'Борщ', 'Омлет'],
+            '-cost': ['Борщ', 'Салат', 'Каша', 'Омлет'],
+        }
+        for ordering, expected in cases.items():
+            with self.subTest(ordering=ordering):
+                self.assertEqual(self.names(ordering=ordering), expected)
+
+    def test_unsupported_ordering_returns_400(self):
+        for ordering in ('id', 'author', 'name,-cooking_time', 'favorites'):
+            with self.subTest(ordering=ordering):
+                response = APIClient().get(
+                    '/api/recipes/', {'ordering': ordering}
+                )
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('ordering', response.json())
+
+    def test_cooking_time_filters(self):
+        self.assertEqual(
+            self.names(ordering='name', cooking_time__lte=10),
+            ['Омлет', 'Салат'],
+        )
+        self.assertEqual(
+            self.names(ordering='name', cooking_time__gte=20),
+            ['Борщ', 'Каша'],
+        )
+        self.assertEqual(
+            self.names(cooking_time__gte=15, cooking_time__lte=30),
+            ['Каша'],
+        )
+
+    def test_calories_and_cost_filters(self):
+        self.assertEqual(
+            self.names(ordering='calories', min_calories=100),
+            ['Омлет', 'Борщ'],
+        )
+        self.assertEqual(
+            self.names(ordering='calories', max_calories=150),
+            ['Салат', 'Омлет'],
+        )
+        self.assertEqual(
+            self.names(ordering='cost', min_cost=40, max_cost=120),
+            ['Каша', 'Салат'],
+        )
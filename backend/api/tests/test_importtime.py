@@ -0,0 +1,14 @@
+from api.management.commands.importtime import is_stdlib
+from django.test import SimpleTestCase
+
+
+class IsStdlibTests(SimpleTestCase):
+    def test_standard_library_modules(self):
+        for package in ('os', 'json', 'sqlite3', '_io', 'encodings'):
+            with self.subTest(package=package):
+                self.assertTrue(is_stdlib(package))
+
+    def test_installed_and_missing_packages(self):
+        for package in ('django', 'rest_framework', 'api', 'missing_package'):
+            with self.subTest(package=package):
+                self.assertFalse(is_stdlib(package))
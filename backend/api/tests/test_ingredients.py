@@ -0,0 +1,81 @@
+import gzip
+import json
+from unittest import mock
+
+from api.catalogue import ingredient_catalogue
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .utils import create_ingredients
+
+URL = '/api/ingredients/'
+
+
+class IngredientListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ingredients = create_ingredients(5)
+
+    def setUp(self):
+        cache.clear()
+        ingredient_catalogue.version = None
+        self.client = APIClient()
+
+    def get(self, params=None, **headers):
+        response = self.client.get(URL, params, **headers)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_limit(self):
+        self.assertEqual(len(self.get({'limit': 2}).json()), 2)
+        for limit in ('0', '-1', 'abc'):
+            with self.subTest(limit=limit):
+                self.assertEqual(len(self.get({'limit': limit}).json()), 5)
+        with mock.patch('api.views.MAX_INGREDIENTS_LIMIT', 3):
+            self.assertEqual(len(self.get({'limit': 100}).json()), 3)
+
+    def test_compact(self):
+        expected = [
+            [ingredient.id, ingredient.name, ingredient.measurement_unit]
+            for ingredient in self.ingredients
+        ]
+        self.assertEqual(self.get({'compact': 1}).json(), expected)
+        self.assertEqual(
+            self.get({'compact': 1, 'limit': 2}).json(), expected[:2]
+        )
+        self.assertEqual(
+            self.get({'compact': 1, 'name': 'Ингредиент 3'}).json(),
+            expected[3:4]
+        )
+
+    def test_gzip_catalogue(self):
+        plain = self.get()
+        compressed = self.get(HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        for response in (plain, compressed):
+            self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(
+            json.loads(gzip.decompress(compressed.content)), plain.json()
+        )
+        self.assertNotEqual(plain['ETag'], compressed['ETag'])
+        response = self.client.get(
+            URL,
+            HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=compressed['ETag'],
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_catalogue_is_rebuilt_after_change(self):
+        self.get(HTTP_ACCEPT_ENCODING='gzip')
+        ingredient = self.ingredients[0]
+        ingredient.name = 'Мука'
+        ingredient.save()
+        response = self.get(HTTP_ACCEPT_ENCODING='gzip')
+        names = [
+            item['name'] for item in json.loads(gzip.decompress(
+                response.content
+            ))
+        ]
+        self.assertIn('Мука', names)
@@ -0,0 +1,64 @@
+from datetime import date
+
+from django.core.cache import cache
+from django.test import TestCase
+from recipes.models import MealPlan
+from rest_framework.test import APIClient
+
+from .utils import create_ingredients, create_recipe, create_tags, create_user
+
+PERIOD = {'start': '2025-06-02', 'end': '2025-06-08'}
+
+
+class MealPlanIngredientsCacheTests(TestCase):
+    """
+    Закэшированные ингредиенты плана питания обновляются после
+    изменения количества в рецепте и названия ингредиента.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('user')
+        cls.ingredients = create_ingredients(2)
+        cls.recipe = create_recipe(cls.user, create_tags(1), cls.ingredients)
+        MealPlan.objects.create(
+            user=cls.user, recipe=cls.recipe, date=date(2025, 6, 3),
+            servings=2
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def meal_plan_ingredients(self):
+        response = self.client.get('/api/meal_plan/ingredients/', PERIOD)
+        self.assertEqual(response.status_code, 200)
+        return [
+            (item['name'], item['amount']) for item in response.json()
+        ]
+
+    def test_amount_change_updates_list(self):
+        self.assertEqual(self.meal_plan_ingredients(), [
+            ('Ингредиент 0', 2), ('Ингредиент 1', 4),
+        ])
+        response = self.client.patch(
+            f'/api/recipes/{self.recipe.pk}/',
+            {'ingredients': [
+                {'id': ingredient.id, 'amount': 3}
+                for ingredient in self.ingredients
+            ]},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.meal_plan_ingredients(), [
+            ('Ингредиент 0', 6), ('Ингредиент 1', 6),
+        ])
+
+    def test_ingredient_rename_updates_list(self):
+        self.meal_plan_ingredients()
+        ingredient = self.ingredients[0]
+        ingredient.name = 'Мука'
+        ingredient.save()
+        self.assertEqual(self.meal_plan_ingredients(), [
+            ('Ингредиент 1', 4), ('Мука', 2),
+        ])
@@ -0,0 +1,31 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from .utils import create_user
+
+
+class ServerTimingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('user')
+        cls.staff = create_user('staff', is_staff=True)
+
+    def server_timing(self, user=None):
+        client = APIClient()
+        if user is not None:
+            client.force_authenticate(user)
+        return client.get('/api/tags/').headers.get('Server-Timing')
+
+    @override_settings(SERVER_TIMING_ENABLED=False)
+    def test_header_is_shown_only_to_staff(self):
+        self.assertIsNone(self.server_timing())
+        self.assertIsNone(self.server_timing(self.user))
+        self.assertRegex(
+            self.server_timing(self.staff),
+            r'^db;dur=[\d.]+;desc="\d+ queries", '
+            r'app;dur=[\d.]+, total;dur=[\d.]+$'
+        )
+
+    @override_settings(SERVER_TIMING_ENABLED=True)
+    def test_setting_shows_header_to_everyone(self):
+        self.assertIsNotNone(self.server_timing())
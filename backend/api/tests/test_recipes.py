@@ -0,0 +1,152 @@
+from api.serializers import RecipeSerializer
+from django.test import TestCase
+from recipes.models import ChangeLog, Recipe, RecipeIngredient
+from rest_framework.test import APIClient
+
+from .utils import create_ingredients, create_recipe, create_tags, create_user
+
+
+class RecipeNestedUpdateTests(TestCase):
+    """
+    Изменение только тегов или количества ингредиентов увеличивает
+    версию рецепта и записывается в журнал синхронизации.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user('author')
+        cls.tags = create_tags(3)
+        cls.ingredients = create_ingredients(2)
+        cls.recipe = create_recipe(
+            cls.author, cls.tags[:2], cls.ingredients
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+        self.url = f'/api/recipes/{self.recipe.pk}/'
+
+    def version(self):
+        return Recipe.objects.values_list('version', flat=True).get(
+            pk=self.recipe.pk
+        )
+
+    def recipe_changes(self):
+        return ChangeLog.objects.filter(
+            resource=ChangeLog.RECIPE, object_id=self.recipe.pk
+        ).count()
+
+    def assert_patch_versions(self, data):
+        version = self.version()
+        changes = self.recipe_changes()
+        response = self.client.patch(self.url, data, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(self.version(), version)
+        self.assertGreater(self.recipe_changes(), changes)
+        return response.json()
+
+    def test_tags_only_update(self):
+        tags = [self.tags[0].id, self.tags[2].id]
+        recipe = self.assert_patch_versions({'tags': tags})
+        self.assertEqual([tag['id'] for tag in recipe['tags']], tags)
+
+    def test_amount_only_update(self):
+        recipe = self.assert_patch_versions({'ingredients': [
+            {'id': self.ingredients[0].id, 'amount': 7},
+            {'id': self.ingredients[1].id, 'amount': 2},
+        ]})
+        self.assertEqual(
+            [item['amount'] for item in recipe['ingredients']], [7, 2]
+        )
+
+    def test_unchanged_update_keeps_version(self):
+        version = self.version()
+        response = self.client.patch(
+            self.url,
+            {'tags': [tag.id for tag in self.tags[:2]]},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.version(), version)
+
+
+class RecipeDiffUpdateTests(TestCase):
+    """
+    Теги и ингредиенты обновляются по разнице: неизмененные строки
+    связей остаются на месте, число запросов не зависит от их числа.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.tags = create_tags(4)
+        cls.ingredients = create_ingredients(4)
+        cls.recipe = create_recipe(
+            create_user('author'), cls.tags[:3], cls.ingredients[:3]
+        )
+
+    def setUp(self):
+        self.serializer = RecipeSerializer()
+
+    def tag_rows(self):
+        return dict(
+            Recipe.tags.through.objects.filter(recipe=self.recipe)
+            .values_list('tag_id', 'id')
+        )
+
+    def ingredient_rows(self):
+        return {
+            row.ingredient_id: (row.id, row.amount)
+            for row in RecipeIngredient.objects.filter(recipe=self.recipe)
+        }
+
+    def test_update_tags_keeps_unchanged_rows(self):
+        first, second, third, fourth = self.tags
+        rows = self.tag_rows()
+        with self.assertNumQueries(3):
+            changed = self.serializer._update_tags(
+                [first, third, fourth], self.recipe
+            )
+        self.assertTrue(changed)
+        updated = self.tag_rows()
+        self.assertEqual(set(updated), {first.id, third.id, fourth.id})
+        self.assertEqual(updated[first.id], rows[first.id])
+        self.assertEqual(updated[third.id], rows[third.id])
+
+    def test_unchanged_tags_issue_one_query(self):
+        with self.assertNumQueries(1):
+            changed = self.serializer._update_tags(
+                self.tags[:3], self.recipe
+            )
+        self.assertFalse(changed)
+
+    def test_update_ingredients_keeps_unchanged_rows(self):
+        first, second, third, fourth = self.ingredients
+        rows = self.ingredient_rows()
+        with self.assertNumQueries(4):
+            changed = self.serializer._update_ingredients(
+                [
+                    {'id': first, 'amount': 1},
+                    {'id': second, 'amount': 5},
+                    {'id': fourth, 'amount': 4},
+                ],
+                self.recipe
+            )
+        self.assertTrue(changed)
+        updated = self.ingredient_rows()
+        self.assertEqual(
+            set(updated), {first.id, second.id, fourth.id}
+        )
+        self.assertEqual(updated[first.id], rows[first.id])
+        self.assertEqual(updated[second.id], (rows[second.id][0], 5))
+        self.assertEqual(updated[fourth.id][1], 4)
+
+    def test_unchanged_ingredients_issue_one_query(self):
+        with self.assertNumQueries(1):
+            changed = self.serializer._update_ingredients(
+                [
+                    {'id': ingredient, 'amount': amount}
+                    for amount, ingredient in enumerate(
+                        self.ingredients[:3], 1
+                    )
+                ],
+                self.recipe
+            )
+        self.assertFalse(changed)
@@ -0,0 +1,185 @@
+import random
+from decimal import Decimal
+
+from api.serializers import RecipeReadSerializer, SubscriptionSerializer
+from api.views import RecipeViewSet
+from django.contrib.auth.models import AnonymousUser
+from django.db import transaction
+from django.test import TestCase
+from recipes.models import Favorite, ShoppingCart
+from recipes.rollups import update_rollups
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from users.models import Subscription
+
+from .utils import create_ingredients, create_recipe, create_tags, create_user
+
+RECIPE_QUERIES = (
+    {},
+    {'fields': 'id,name,image,cooking_time'},
+    {'fields': 'id,author,tags,ingredients', 'expand': ''},
+    {'fields': 'id,author,is_favorited,is_in_shopping_cart,calories'},
+    {'expand': 'author'},
+    {'expand': 'tags,ingredients'},
+)
+
+
+class FlatListSerializerTests(TestCase):
+    """
+    Списочные сериализаторы, собирающие ответ без полей DRF,
+    возвращают то же, что сериализатор каждого объекта.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('user')
+        authors = [create_user(f'author{index}') for index in range(3)]
+        tags = create_tags(3)
+        ingredients = create_ingredients(4)
+        for ingredient in ingredients[:3]:
+            ingredient.calories = Decimal('1.5')
+            ingredient.save()
+        recipes = [
+            create_recipe(
+                authors[index % 3],
+                tags[:index % 3 + 1],
+                ingredients[index % 2:index % 4 + 1],
+                name=f'Рецепт {index}',
+                image='' if index == 4 else 'recipes/images/recipe.png',
+            )
+            for index in range(8)
+        ]
+        update_rollups()
+        for recipe in recipes[::2]:
+            Favorite.objects.create(user=cls.user, recipe=recipe)
+        for recipe in recipes[::3]:
+            ShoppingCart.objects.create(user=cls.user, recipe=recipe)
+        for author in authors[:2]:
+            Subscription.objects.create(user=cls.user, author=author)
+        Subscription.objects.create(user=authors[0], author=authors[1])
+
+    def request(self, user, params):
+        request = Request(APIRequestFactory().get('/', params))
+        request.user = user
+        return request
+
+    def assert_flat_list_matches(self, serializer_class, queryset, context):
+        self.assertEqual(
+            serializer_class(queryset, many=True, context=context).data,
+            [
+                serializer_class(obj, context=context).data
+                for obj in queryset
+            ]
+        )
+
+    def test_recipes(self):
+        for user in (AnonymousUser(), self.user):
+            for params in RECIPE_QUERIES:
+                with self.subTest(user=user, params=params):
+                    view = RecipeViewSet(
+                        request=self.request(user, params),
+                        action='list',
+                        kwargs={},
+                        format_kwarg=None,
+                    )
+                    self.assert_flat_list_matches(
+                        RecipeReadSerializer,
+                        view.get_queryset(),
+                        view.get_serializer_context(),
+                    )
+
+    def test_subscriptions(self):
+        for params in ({}, {'recipes_limit': '1'}):
+            with self.subTest(params=params):
+                self.assert_flat_list_matches(
+                    SubscriptionSerializer,
+                    Subscription.objects.filter(user=self.user)
+                    .select_related('author').order_by('id'),
+                    {'request': self.request(self.user, params)},
+                )
+
+
+class RandomizedFlatListSerializerTests(FlatListSerializerTests):
+    """
+    Те же проверки на случайных наборах рецептов, тегов, ингредиентов,
+    избранного и подписок. Каждый набор создается в точке сохранения
+    и откатывается после проверки.
+    """
+    SEEDS = range(10)
+
+    @classmethod
+    def setUpTestData(cls):
+        pass
+
+    def create_data(self, rng):
+        self.user = create_user('user')
+        authors = [
+            create_user(f'author{index}')
+            for index in range(rng.randint(1, 4))
+        ]
+        tags = create_tags(rng.randint(0, 4))
+        ingredients = create_ingredients(rng.randint(0, 5))
+        for ingredient in ingredients:
+            if rng.random() < 0.7:
+                ingredient.calories = Decimal(rng.randint(0, 500)) / 10
+                ingredient.price = Decimal(rng.randint(0, 500)) / 10
+                ingredient.save()
+        recipes = [
+            create_recipe(
+                rng.choice(authors),
+                rng.sample(tags, rng.randint(0, len(tags))),
+                rng.sample(ingredients, rng.randint(0, len(ingredients))),
+                name=rng.choice(('Борщ', 'Каша', 'Омлет')),
+                cooking_time=rng.randint(1, 120),
+                image=rng.choice(('', 'recipes/images/recipe.png')),
+            )
+            for _ in range(rng.randint(0, 10))
+        ]
+        update_rollups()
+        for recipe in recipes:
+            if rng.random() < 0.5:
+                Favorite.objects.create(user=self.user, recipe=recipe)
+            if rng.random() < 0.5:
+                ShoppingCart.objects.create(user=self.user, recipe=recipe)
+        for author in rng.sample(authors, rng.randint(0, len(authors))):
+            Subscription.objects.create(user=self.user, author=author)
+        return recipes
+
+    def for_each_seed(self, check):
+        for seed in self.SEEDS:
+            with self.subTest(seed=seed), transaction.atomic():
+                rng = random.Random(seed)
+                check(rng, self.create_data(rng))
+                transaction.set_rollback(True)
+
+    def test_recipes(self):
+        def check(rng, recipes):
+            for user in (AnonymousUser(), self.user):
+                view = RecipeViewSet(
+                    request=self.request(user, rng.choice(RECIPE_QUERIES)),
+                    action='list',
+                    kwargs={},
+                    format_kwarg=None,
+                )
+                self.assert_flat_list_matches(
+                    RecipeReadSerializer,
+                    view.get_queryset(),
+                    view.get_serializer_context(),
+                )
+        self.for_each_seed(check)
+
+    def test_subscriptions(self):
+        def check(rng, recipes):
+            for params in (
+                {},
+                {'recipes_limit': '0'},
+                {'recipes_limit': '1'},
+                {'recipes_limit': str(len(recipes) + 1)},
+                {'recipes_limit': str(rng.randint(0, len(recipes)))},
+            ):
+                self.assert_flat_list_matches(
+                    SubscriptionSerializer,
+                    Subscription.objects.filter(user=self.user)
+                    .select_related('author').order_by('id'),
+                    {'request': self.request(self.user, params)},
+                )
+        self.for_each_seed(check)
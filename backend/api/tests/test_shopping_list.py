@@ -0,0 +1,62 @@
+from api.shopping_list import normalize_units, shopping_list
+from django.test import SimpleTestCase, TestCase
+from recipes.models import Ingredient, ShoppingCart
+
+from .utils import create_recipe, create_user
+
+
+class NormalizeUnitsTests(SimpleTestCase):
+    def test_equivalent_units_are_merged(self):
+        self.assertEqual(
+            normalize_units([
+                ('Мука', 'кг', 2),
+                ('Молоко', 'мл', 250),
+                ('Мука', 'г', 300),
+                ('Молоко', 'л', 1),
+                ('Сахар', 'ст. л.', 2),
+                ('Сахар', 'ч. л.', 1),
+            ]),
+            [
+                (('Молоко', 'мл'), 1250),
+                (('Мука', 'г'), 2300),
+                (('Сахар', 'ч. л.'), 7),
+            ]
+        )
+
+    def test_other_units_and_names_are_kept_apart(self):
+        self.assertEqual(
+            normalize_units([
+                ('Яйцо', 'шт.', 2),
+                ('Мука', 'г', 100),
+                ('Яйцо', 'шт.', 1),
+                ('Мука', 'стакан', 1),
+                ('Соль', 'г', 5),
+            ]),
+            [
+                (('Мука', 'г'), 100),
+                (('Мука', 'стакан'), 1),
+                (('Соль', 'г'), 5),
+                (('Яйцо', 'шт.'), 3),
+            ]
+        )
+
+
+class ShoppingListUnitsTests(TestCase):
+    def test_cart_amounts_are_merged_in_canonical_unit(self):
+        user = create_user('user')
+        ingredients = Ingredient.objects.bulk_create(
+            Ingredient(name=name, measurement_unit=unit)
+            for name, unit in (
+                ('Мука', 'г'), ('Мука', 'кг'), ('Молоко', 'л'),
+                ('Молоко', 'мл'),
+            )
+        )
+        for recipe in (
+            create_recipe(user, ingredients=ingredients),
+            create_recipe(user, ingredients=ingredients[::-1]),
+        ):
+            ShoppingCart.objects.create(user=user, recipe=recipe)
+        self.assertEqual(
+            shopping_list(user),
+            [(('Молоко', 'мл'), 5005), (('Мука', 'г'), 5005)]
+        )
@@ -0,0 +1,128 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from recipes.models import RecipeSimilarity
+from recipes.similarity import rebuild_similarities, update_recipe_similarities
+from rest_framework.test import APIClient
+
+from .utils import (PNG_IMAGE, create_ingredients, create_recipe, create_tags,
+                    create_user)
+
+
+class SimilarRecipesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.recipe = create_recipe(create_user('author'))
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_invalid_or_missing_recipe_returns_404(self):
+        for pk in ('abc', self.recipe.pk + 1):
+            with self.subTest(pk=pk):
+                response = self.client.get(f'/api/recipes/{pk}/similar/')
+                self.assertEqual(response.status_code, 404)
+
+    def test_recipe_without_similar_returns_empty_list(self):
+        response = self.client.get(f'/api/recipes/{self.recipe.pk}/similar/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+
+
+class SmallCatalogueSimilarityTests(TestCase):
+    """
+    В небольшом каталоге каждый признак есть у большой доли рецептов,
+    но похожие рецепты все равно подбираются.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        author = create_user('author')
+        tags = create_tags(2)
+        ingredients = create_ingredients(3)
+        cls.recipes = [
+            create_recipe(author, tags[:1], ingredients[:2]),
+            create_recipe(author, tags[:1], ingredients[1:]),
+            create_recipe(author, tags[1:], ingredients[:1]),
+            create_recipe(author, tags[1:], ingredients[2:]),
+        ]
+
+    def similar_ids(self, recipe):
+        response = APIClient().get(f'/api/recipes/{recipe.pk}/similar/')
+        return [item['id'] for item in response.json()]
+
+    def test_rebuild_finds_recipes_with_common_features(self):
+        rebuild_similarities()
+        first, second, third, fourth = self.recipes
+        self.assertEqual(self.similar_ids(first), [second.id, third.id])
+        self.assertEqual(self.similar_ids(fourth), [third.id, second.id])
+
+    def test_update_finds_recipes_with_common_features(self):
+        first, second, third, _ = self.recipes
+        update_recipe_similarities([first.pk])
+        self.assertEqual(self.similar_ids(first), [second.id, third.id])
+
+    def test_update_of_several_recipes_matches_rebuild(self):
+        rebuild_similarities()
+        expected = [self.similar_ids(recipe) for recipe in self.recipes]
+        first, _, _, fourth = self.recipes
+        update_recipe_similarities([first.pk, fourth.pk])
+        self.assertEqual(
+            [self.similar_ids(recipe) for recipe in self.recipes], expected
+        )
+
+    def test_update_query_count_does_not_depend_on_recipes_count(self):
+        first, _, _, fourth = self.recipes
+        with CaptureQueriesContext(connection) as single:
+            update_recipe_similarities([first.pk])
+        with CaptureQueriesContext(connection) as several:
+            update_recipe_similarities([first.pk, fourth.pk])
+        self.assertEqual(len(several), len(single))
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class BulkSimilarityTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user('author')
+        cls.tags = create_tags(1)
+        cls.ingredients = create_ingredients(2)
+        cls.recipe = create_recipe(cls.author, cls.tags, cls.ingredients)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def test_bulk_created_recipes_get_similar_recipes(self):
+        item = {
+            'name': 'Рецепт',
+            'text': 'Описание',
+            'cooking_time': 10,
+            'image': PNG_IMAGE,
+            'tags': [tag.id for tag in self.tags],
+            'ingredients': [
+                {'id': ingredient.id, 'amount': 1}
+                for ingredient in self.ingredients
+            ],
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/api/recipes/bulk/', [item, item], format='json'
+            )
+        self.assertEqual(response.status_code, 201)
+        first, second = (result['id'] for result in response.json())
+        self.assertEqual(
+            list(
+                RecipeSimilarity.objects.filter(recipe_id=first)
+                .order_by('similar_id').values_list('similar_id', flat=True)
+            ),
+            [self.recipe.id, second],
+        )
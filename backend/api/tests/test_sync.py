@@ -0,0 +1,56 @@
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .utils import create_ingredients, create_recipe, create_tags, create_user
+
+
+@mock.patch('api.views.SYNC_SETTLE_SECONDS', 0)
+class SyncNestedUpdateTests(TestCase):
+    """
+    Изменение только тегов или ингредиентов рецепта попадает
+    в /api/sync/.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user('author')
+        cls.tags = create_tags(2)
+        cls.ingredients = create_ingredients(2)
+        cls.recipe = create_recipe(cls.author, cls.tags[:1], cls.ingredients)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def sync(self, since):
+        response = self.client.get('/api/sync/', {'since': since})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def assert_synced(self, data):
+        token = self.sync('0')['token']
+        response = self.client.patch(
+            f'/api/recipes/{self.recipe.pk}/', data, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        updated = self.sync(token)['recipes']['updated']
+        self.assertEqual(
+            [recipe['id'] for recipe in updated], [self.recipe.pk]
+        )
+        return updated[0]
+
+    def test_tags_only_update(self):
+        recipe = self.assert_synced({'tags': [self.tags[1].id]})
+        self.assertEqual(
+            [tag['id'] for tag in recipe['tags']], [self.tags[1].id]
+        )
+
+    def test_amount_only_update(self):
+        recipe = self.assert_synced({'ingredients': [
+            {'id': ingredient.id, 'amount': 9}
+            for ingredient in self.ingredients
+        ]})
+        self.assertEqual(
+            [item['amount'] for item in recipe['ingredients']], [9, 9]
+        )
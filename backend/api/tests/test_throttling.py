@@ -0,0 +1,65 @@
+from api.throttling import TokenBucketThrottle, redis_url
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+PROXY_ADDR = '172.18.0.5'
+
+
+class LimitedView(APIView):
+    authentication_classes = ()
+    permission_classes = ()
+    throttle_classes = (TokenBucketThrottle,)
+    throttle_scope = 'test'
+
+    def get(self, request):
+        return Response()
+
+
+@override_settings(REST_FRAMEWORK={
+    **settings.REST_FRAMEWORK,
+    'DEFAULT_THROTTLE_RATES': {'test': '2/min'},
+    'NUM_PROXIES': 1,
+})
+class AnonymousThrottleTests(SimpleTestCase):
+    """
+    Анонимные клиенты за nginx различаются по адресу, который
+    nginx добавляет последним в X-Forwarded-For.
+    """
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+
+    def get(self, forwarded_for):
+        request = self.factory.get(
+            '/', HTTP_X_FORWARDED_FOR=forwarded_for, REMOTE_ADDR=PROXY_ADDR
+        )
+        return LimitedView.as_view()(request).status_code
+
+    def test_spoofed_forwarded_for_shares_bucket(self):
+        statuses = [
+            self.get(f'10.0.0.{index}, 203.0.113.7') for index in range(3)
+        ]
+        self.assertEqual(statuses, [200, 200, 429])
+
+    def test_clients_have_separate_buckets(self):
+        self.assertEqual(
+            [self.get('203.0.113.7') for _ in range(3)], [200, 200, 429]
+        )
+        self.assertEqual(self.get('203.0.113.8'), 200)
+
+
+class RedisUrlTests(SimpleTestCase):
+    def test_first_location_is_used(self):
+        for location in (
+            'redis://primary:6379/0',
+            'redis://primary:6379/0,redis://replica:6379/0',
+            ['redis://primary:6379/0', 'redis://replica:6379/0'],
+        ):
+            with self.subTest(location=location):
+                self.assertEqual(
+                    redis_url(location), 'redis://primary:6379/0'
+                )
@@ -0,0 +1,53 @@
+from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
+from users.models import MyUser
+
+PNG_IMAGE = (
+    'data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAA'
+    'DUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=='
+)
+
+
+def create_user(username, **fields):
+    return MyUser.objects.create_user(
+        email=f'{username}@example.com',
+        username=username,
+        first_name=username,
+        last_name=username,
+        password='password',
+        **fields
+    )
+
+
+def create_tags(count):
+    return [
+        Tag.objects.create(name=f'Тег {index}', slug=f'tag-{index}')
+        for index in range(count)
+    ]
+
+
+def create_ingredients(count):
+    return Ingredient.objects.bulk_create(
+        Ingredient(name=f'Ингредиент {index}', measurement_unit='г')
+        for index in range(count)
+    )
+
+
+def create_recipe(author, tags=(), ingredients=(), **fields):
+    """
+    Рецепт с тегами и ингредиентами; количество ингредиента
+    на единицу больше его позиции в списке.
+    """
+    recipe = Recipe.objects.create(
+        author=author,
+        name=fields.pop('name', 'Рецепт'),
+        image=fields.pop('image', 'recipes/images/recipe.png'),
+        text=fields.pop('text', 'Описание'),
+        cooking_time=fields.pop('cooking_time', 10),
+        **fields
+    )
+    recipe.tags.set(tags)
+    RecipeIngredient.objects.bulk_create(
+        RecipeIngredient(recipe=recipe, ingredient=ingredient, amount=amount)
+        for amount, ingredient in enumerate(ingredients, 1)
+    )
+    return recipe
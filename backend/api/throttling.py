@@ -0,0 +1,167 @@
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.redis import RedisCache
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Пополнение и списание токена выполняются атомарно на сервере Redis,
+# время берется с сервера, чтобы не зависеть от часов воркеров.
+REDIS_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local ttl = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], ttl)
+return {allowed, tostring(tokens)}
+"""
+
+
+def parse_rate(rate):
+    """
+    Разбирает ограничение вида '60/min' в емкость корзины
+    и скорость пополнения в токенах в секунду.
+    """
+    try:
+        count, period = rate.split('/')
+        capacity = int(count)
+        seconds = PERIODS[period[0]]
+    except (ValueError, KeyError, IndexError):
+        raise ImproperlyConfigured(f'Некорректное ограничение частоты {rate}.')
+    return capacity, capacity / seconds
+
+
+class CacheBucketStore:
+    """
+    Хранилище корзин в кэше Django.
+    Состояние читается и записывается под блокировкой процесса, поэтому
+    с локальным кэшем корзины точны в пределах воркера.
+    """
+    def __init__(self, cache):
+        self.cache = cache
+        self.lock = threading.Lock()
+
+    def consume(self, key, capacity, rate):
+        now = time.time()
+        with self.lock:
+            tokens, updated = self.cache.get(key, (capacity, now))
+            tokens = min(capacity, tokens + max(now - updated, 0) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self.cache.set(key, (tokens, now), timeout=capacity / rate + 1)
+        return allowed, tokens
+
+
+class RedisBucketStore:
+    """
+    Хранилище корзин в Redis: одна команда EVALSHA на запрос,
+    корзины общие для всех воркеров и серверов.
+    Клиент создается по адресу кэша default, ключи строятся
+    кэшем Django с его префиксом и версией.
+    """
+    def __init__(self, cache, url):
+        import redis
+
+        self.cache = cache
+        self.client = redis.Redis.from_url(url)
+        self.script = self.client.register_script(REDIS_TOKEN_BUCKET)
+
+    def consume(self, key, capacity, rate):
+        allowed, tokens = self.script(
+            keys=(self.cache.make_and_validate_key(key),),
+            args=(capacity, rate, int(capacity / rate) + 1)
+        )
+        return bool(allowed), float(tokens)
+
+
+def redis_url(location):
+    """
+    Адрес сервера Redis для записи: первый из LOCATION кэша.
+    """
+    if isinstance(location, str):
+        location = location.split(',')
+    return location[0]
+
+
+@lru_cache(maxsize=None)
+def get_bucket_store():
+    if isinstance(cache, RedisCache):
+        return RedisBucketStore(
+            cache, redis_url(settings.CACHES['default']['LOCATION'])
+        )
+    return CacheBucketStore(cache)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Ограничение частоты запросов по алгоритму token bucket.
+    Область ограничения берется из throttle_scopes view по действию,
+    затем из throttle_scope view, затем из атрибута scope класса.
+    Ограничения задаются в REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'].
+    Ключ корзины — пользователь, для анонимных запросов — IP-адрес.
+    View без области ограничения не ограничиваются.
+    """
+    scope = None
+
+    def __init__(self):
+        self.capacity = self.rate = self.tokens = None
+
+    def get_scope(self, view):
+        scopes = getattr(view, 'throttle_scopes', {})
+        return (
+            scopes.get(getattr(view, 'action', None))
+            or getattr(view, 'throttle_scope', None)
+            or self.scope
+        )
+
+    def get_rate(self, scope):
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+        if rate is None:
+            raise ImproperlyConfigured(
+                f'Не задано ограничение частоты для области {scope}.'
+            )
+        return parse_rate(rate)
+
+    def get_cache_key(self, request, scope):
+        if request.user and request.user.is_authenticated:
+            ident = f'user:{request.user.pk}'
+        else:
+            ident = f'ip:{self.get_ident(request)}'
+        return f'throttle:{scope}:{ident}'
+
+    def allow_request(self, request, view):
+        scope = self.get_scope(view)
+        if scope is None:
+            return True
+        self.capacity, self.rate = self.get_rate(scope)
+        allowed, self.tokens = get_bucket_store().consume(
+            self.get_cache_key(request, scope), self.capacity, self.rate
+        )
+        return allowed
+
+    def wait(self):
+        if self.tokens is None:
+            return None
+        return max(1 - self.tokens, 0) / self.rate
+
+
+class ShortLinkThrottle(TokenBucketThrottle):
+    scope = 'short_link'
@@ -1,14 +1,16 @@
 from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from .views import (IngredientViewSet, RecipeViewSet, TagViewSet,
-                    UserAvatarUpdateView, UserViewSet)
+from .views import (IngredientViewSet, MealPlanViewSet, RecipeViewSet,
+                    TagViewSet, UserAvatarUpdateView, UserViewSet, metrics,
+                    readiness, sync)
 
 router_v1 = DefaultRouter()
 router_v1.register(r'tags', TagViewSet, basename='tags')
 router_v1.register(r'recipes', RecipeViewSet, basename='recipes')
 router_v1.register(r'users', UserViewSet, basename='users')
 router_v1.register(r'ingredients', IngredientViewSet, basename='ingredients')
+router_v1.register(r'meal_plan', MealPlanViewSet, basename='meal_plan')
 
 urlpatterns = router_v1.urls
 
@@ -18,4 +20,7 @@ urlpatterns += [
         UserAvatarUpdateView.as_view(),
         name='user-avatar-upload'
     ),
+    path('metrics/', metrics, name='metrics'),
+    path('health/ready/', readiness, name='readiness'),
+    path('sync/', sync, name='sync'),
 ]
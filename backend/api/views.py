@@ -1,38 +1,153 @@
+import re
+from datetime import timedelta
+
 from django.conf import settings
-from django.db.models import F, Sum
+from django.db import DatabaseError, connection
+from django.db.models import Exists, OuterRef, Prefetch, Q, Subquery
 from django.http import HttpResponse
 from django.shortcuts import get_object_or_404, redirect
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
 from django_filters.rest_framework import DjangoFilterBackend
-from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
-                            ShoppingCart, Tag)
+from recipes.models import (ChangeLog, Favorite, Ingredient, MealPlan, Recipe,
+                            RecipeIngredient, RecipeSimilarity, ShoppingCart,
+                            Tag)
 from rest_framework import generics, permissions, status, viewsets
-from rest_framework.decorators import action, api_view, permission_classes
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.decorators import (action, api_view,
+                                       authentication_classes,
+                                       permission_classes, throttle_classes)
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from users.models import MyUser, Subscription
 
-from .filters import IngredientFilter, RecipeFilter
+from .catalogue import ingredient_catalogue
+from .constants import (MAX_INGREDIENTS_LIMIT, SYNC_PAGE_SIZE,
+                        SYNC_SETTLE_SECONDS)
+from .filters import IngredientFilter, MealPlanFilter, RecipeFilter
+from .metrics import MetricsMixin, registry
+from .mixins import ConditionalGetMixin, ReplicaReadMixin, SparseFieldsMixin
 from .paginators import CustomPagination
 from .permissions import IsAuthorOrReadOnly
-from .serializers import (FavoriteSerializer, IngredientSerializer,
+from .renderers import FastJSONRenderer
+from .serializers import (FavoriteSerializer, IngredientCompactSerializer,
+                          IngredientSerializer, MealPlanRangeSerializer,
+                          MealPlanSerializer, RecipeBulkSerializer,
                           RecipeReadSerializer, RecipeSerializer,
-                          ShoppingCartSerializer, SubscriptionSerializer,
-                          TagSerializer, UserAvatarSerializer,
-                          UserCreateSerializer, UserListSerializer)
+                          RecipeShortSerializer, ShoppingCartSerializer,
+                          SubscriptionSerializer, TagSerializer,
+                          UserAvatarSerializer, UserCreateSerializer,
+                          UserListSerializer)
+from .shopping_list import (cached_meal_plan_list, shopping_list,
+                            shopping_list_response)
+from .throttling import ShortLinkThrottle
+
+accepts_gzip = re.compile(r'\bgzip\b').search
 
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@throttle_classes([ShortLinkThrottle])
 def short_link_redirect(request, short_code):
     recipe = get_object_or_404(Recipe, short_uuid=short_code)
     redirect_url = f'/recipes/{recipe.id}/'
     return redirect(redirect_url)
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def metrics(request):
+    return HttpResponse(
+        registry.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def readiness(request):
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except DatabaseError:
+        return Response(
+            {'status': 'unavailable'},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+    return Response({'status': 'ready'})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def sync(request):
+    """
+    Изменения рецептов, избранного, корзины и подписок пользователя
+    после токена since по журналу изменений.
+    Для каждого объекта учитывается только последнее изменение.
+    Если has_more истинно, клиент запрашивает следующую порцию
+    с полученным токеном.
+    """
+    since = request.query_params.get('since', '0')
+    if not since.isdigit():
+        return Response(
+            {'since': 'Некорректный токен синхронизации.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    changes = list(
+        ChangeLog.objects
+        .filter(
+            Q(user__isnull=True) | Q(user=request.user),
+            id__gt=int(since),
+            created_at__lte=(
+                timezone.now() - timedelta(seconds=SYNC_SETTLE_SECONDS)
+            ),
+        )
+        .values_list('id', 'resource', 'object_id', 'action')
+        [:SYNC_PAGE_SIZE + 1]
+    )
+    has_more = len(changes) > SYNC_PAGE_SIZE
+    changes = changes[:SYNC_PAGE_SIZE]
+    latest = {}
+    for _, resource, object_id, change in changes:
+        latest[resource, object_id] = change
+    result = {
+        resource: {'updated': [], 'deleted': []}
+        for resource, _ in ChangeLog.RESOURCES
+    }
+    for (resource, object_id), change in latest.items():
+        key = 'deleted' if change == ChangeLog.DELETE else 'updated'
+        result[resource][key].append(object_id)
+    recipe_ids = result[ChangeLog.RECIPE]['updated']
+    recipes = RecipeReadSerializer(
+        RecipeViewSet.queryset.filter(id__in=recipe_ids),
+        many=True,
+        context={'request': request}
+    ).data
+    found = {recipe['id'] for recipe in recipes}
+    result[ChangeLog.RECIPE] = {
+        'updated': recipes,
+        'deleted': result[ChangeLog.RECIPE]['deleted'] + [
+            recipe_id for recipe_id in recipe_ids if recipe_id not in found
+        ],
+    }
+    return Response({
+        'token': str(changes[-1][0]) if changes else since,
+        'has_more': has_more,
+        **result,
+    })
+
+
+class IngredientViewSet(
+    MetricsMixin, ReplicaReadMixin, ConditionalGetMixin,
+    viewsets.ReadOnlyModelViewSet
+):
     """
     ViewSet для просмотра ингредиентов.
     Позволяет получать список и детали ингредиентов.
+    Параметр limit ограничивает длину списка (не больше
+    MAX_INGREDIENTS_LIMIT), compact=1 возвращает ингредиенты
+    списками [id, name, measurement_unit]. Полный каталог без фильтров
+    отдается из заранее сжатого JSON (IngredientCatalogue).
     """
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
@@ -40,9 +155,123 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = (permissions.AllowAny,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = IngredientFilter
+    throttle_scope = 'ingredients'
+    catalogue_version = None
+
+    def get_limit(self):
+        limit = self.request.query_params.get('limit')
+        if limit is not None and limit.isdigit() and int(limit) > 0:
+            return min(int(limit), MAX_INGREDIENTS_LIMIT)
+        return None
+
+    def is_compact(self):
+        return self.request.query_params.get('compact') in ('1', 'true')
+
+    def is_full_catalogue(self):
+        request = self.request
+        return (
+            self.action == 'list'
+            and self.get_limit() is None
+            and not any(
+                name in request.query_params
+                for name in self.filterset_class.base_filters
+            )
+            and isinstance(request.accepted_renderer, FastJSONRenderer)
+            and request.accepted_media_type == FastJSONRenderer.media_type
+        )
+
+    def get_serializer_class(self):
+        if self.action == 'list' and self.is_compact():
+            return IngredientCompactSerializer
+        return super().get_serializer_class()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        limit = self.get_limit()
+        if self.action == 'list' and limit is not None:
+            return queryset[:limit]
+        return queryset
+
+    def get_etag_version(self):
+        version = super().get_etag_version()
+        if not self.is_full_catalogue():
+            return version
+        # Сжатый и несжатый каталог — разные представления,
+        # у строгого ETag они должны различаться.
+        self.catalogue_version = version
+        return (*version, bool(accepts_gzip(
+            self.request.headers.get('Accept-Encoding', '')
+        )))
+
+    def list(self, request, *args, **kwargs):
+        if not self.is_full_catalogue():
+            return super().list(request, *args, **kwargs)
+        return self.conditional_response(
+            self.catalogue_list, request, *args, **kwargs
+        )
+
+    def catalogue_list(self, request, *args, **kwargs):
+        version = self.catalogue_version
+        if version is None:
+            version = super().get_etag_version()
+        content, compressed = ingredient_catalogue.get(
+            version, self.is_compact()
+        )
+        if accepts_gzip(request.headers.get('Accept-Encoding', '')):
+            response = HttpResponse(
+                compressed, content_type=FastJSONRenderer.media_type
+            )
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(
+                content, content_type=FastJSONRenderer.media_type
+            )
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+
+class MealPlanViewSet(MetricsMixin, ReplicaReadMixin, viewsets.ModelViewSet):
+    """
+    ViewSet для плана питания текущего пользователя.
+    Позволяет планировать рецепты на даты с количеством порций
+    и получать суммарные ингредиенты за период.
+    """
+    serializer_class = MealPlanSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+    filter_backends = (DjangoFilterBackend,)
+    filterset_class = MealPlanFilter
+
+    def get_queryset(self):
+        return MealPlan.objects.filter(user=self.request.user)
+
+    def get_period(self):
+        serializer = MealPlanRangeSerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        period = serializer.validated_data
+        return period['start'], period['end']
 
+    @action(detail=False, methods=('get',))
+    def ingredients(self, request):
+        start, end = self.get_period()
+        return Response([
+            {'name': name, 'measurement_unit': unit, 'amount': amount}
+            for (name, unit), amount in cached_meal_plan_list(
+                request.user, start, end
+            )
+        ])
+
+    @action(detail=False, methods=('get',))
+    def download(self, request):
+        start, end = self.get_period()
+        return shopping_list_response(
+            cached_meal_plan_list(request.user, start, end),
+            f'meal_plan_{start}_{end}.txt'
+        )
 
-class UserAvatarUpdateView(generics.UpdateAPIView):
+
+class UserAvatarUpdateView(
+    MetricsMixin, ReplicaReadMixin, generics.UpdateAPIView
+):
     """
     View для обновления аватара пользователя.
     Позволяет пользователю загрузить новый аватар.
@@ -59,7 +288,9 @@ class UserAvatarUpdateView(generics.UpdateAPIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(
+    MetricsMixin, ReplicaReadMixin, SparseFieldsMixin, viewsets.ModelViewSet
+):
     """
     ViewSet для управления пользователями.
     Позволяет создавать, просматривать и редактировать пользователей,
@@ -67,6 +298,15 @@ class UserViewSet(viewsets.ModelViewSet):
     queryset = MyUser.objects.all()
     serializer_class = UserListSerializer
     permission_classes = (permissions.AllowAny,)
+    throttle_scopes = {'create': 'registration'}
+    sparse_actions = ('list', 'retrieve', 'me')
+    sparse_fields = UserListSerializer.Meta.fields
+    sparse_columns = ('email', 'username', 'first_name', 'last_name', 'avatar')
+
+    def get_sparse_queryset(self, queryset, fields, expand):
+        return queryset.only(
+            'id', *(name for name in self.sparse_columns if name in fields)
+        )
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -114,7 +354,9 @@ class UserViewSet(viewsets.ModelViewSet):
     )
     def subscriptions(self, request):
         user = request.user
-        subscriptions = Subscription.objects.filter(user=user)
+        subscriptions = Subscription.objects.filter(
+            user=user
+        ).select_related('author')
         page = self.paginate_queryset(subscriptions)
         if page is not None:
             serializer = SubscriptionSerializer(
@@ -172,7 +414,10 @@ class UserViewSet(viewsets.ModelViewSet):
             return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(
+    MetricsMixin, ReplicaReadMixin, ConditionalGetMixin,
+    viewsets.ReadOnlyModelViewSet
+):
     """
     ViewSet для работы с тегами.
     Позволяет получать список тегов и их детали.
@@ -183,7 +428,10 @@ class TagViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = (permissions.AllowAny,)
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(
+    MetricsMixin, ReplicaReadMixin, ConditionalGetMixin, SparseFieldsMixin,
+    viewsets.ModelViewSet
+):
     """
     ViewSet для управления рецептами.
     Позволяет создавать, просматривать, редактировать и удалять рецепты.
@@ -199,12 +447,111 @@ class RecipeViewSet(viewsets.ModelViewSet):
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
     pagination_class = CustomPagination
+    conditional_actions = ('retrieve',)
+    replica_actions = ('list', 'retrieve', 'similar')
+    sparse_fields = RecipeReadSerializer.Meta.fields
+    expandable_fields = ('tags', 'author', 'ingredients')
+    sparse_columns = (
+        'author', 'name', 'image', 'text', 'cooking_time', 'calories', 'cost'
+    )
 
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return RecipeReadSerializer
         return RecipeSerializer
 
+    def get_sparse_queryset(self, queryset, fields, expand):
+        """
+        Загружает только столбцы и связи выбранных полей.
+        Нераскрытым связям достаточно идентификаторов: автору —
+        author_id рецепта, тегам и ингредиентам — строк
+        промежуточных таблиц без справочников.
+        """
+        queryset = queryset.select_related(None).prefetch_related(None).only(
+            'id', *(name for name in self.sparse_columns if name in fields)
+        )
+        if 'author' in fields and 'author' in expand:
+            queryset = queryset.select_related('author')
+        if 'tags' in fields:
+            queryset = queryset.prefetch_related(
+                'tags' if 'tags' in expand
+                else Prefetch('tags', queryset=Tag.objects.only('id'))
+            )
+        if 'ingredients' in fields:
+            queryset = queryset.prefetch_related(
+                'recipe_ingredients__ingredient' if 'ingredients' in expand
+                else Prefetch(
+                    'recipe_ingredients',
+                    queryset=RecipeIngredient.objects.only(
+                        'recipe_id', 'ingredient_id', 'amount'
+                    )
+                )
+            )
+        return queryset
+
+    def get_etag_version(self):
+        queryset = Recipe.objects.filter(pk=self.kwargs['pk']).annotate(
+            tags_updated_at=Subquery(
+                Tag.objects.filter(recipes=OuterRef('pk'))
+                .order_by('-updated_at').values('updated_at')[:1]
+            ),
+            ingredients_updated_at=Subquery(
+                Ingredient.objects.filter(recipes=OuterRef('pk'))
+                .order_by('-updated_at').values('updated_at')[:1]
+            ),
+        )
+        fields = [
+            'version',
+            'tags_updated_at',
+            'ingredients_updated_at',
+            'author__version',
+        ]
+        user = self.request.user
+        if user.is_authenticated:
+            queryset = queryset.annotate(
+                is_favorited=Exists(Favorite.objects.filter(
+                    user=user, recipe=OuterRef('pk')
+                )),
+                is_in_shopping_cart=Exists(ShoppingCart.objects.filter(
+                    user=user, recipe=OuterRef('pk')
+                )),
+                is_subscribed=Exists(Subscription.objects.filter(
+                    user=user, author=OuterRef('author')
+                )),
+            )
+            fields += ['is_favorited', 'is_in_shopping_cart', 'is_subscribed']
+        version = queryset.values_list(*fields).first()
+        if version is None:
+            return None
+        return user.pk, version, [
+            None if names is None else sorted(names)
+            for names in self.get_sparse_selection()
+        ]
+
+    @action(
+        detail=False,
+        methods=('post',),
+        url_path='bulk',
+        permission_classes=(permissions.IsAuthenticated,)
+    )
+    def bulk(self, request):
+        serializer = RecipeBulkSerializer(
+            data=request.data,
+            context=self.get_serializer_context()
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        created = sum(
+            1 for item in serializer.instance if 'recipe' in item
+        )
+        if created == len(serializer.instance):
+            response_status = status.HTTP_201_CREATED
+        elif created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(serializer.data, status=response_status)
+
     @action(detail=True, methods=('get',), url_path='get-link')
     def get_short_link(self, request, pk=None):
         recipe = self.get_object()
@@ -275,6 +622,21 @@ class RecipeViewSet(viewsets.ModelViewSet):
         elif request.method == 'DELETE':
             return self._remove_from(request, pk, Favorite, error_message)
 
+    @action(detail=True, methods=('get',))
+    def similar(self, request, pk=None):
+        """
+        Похожие рецепты из таблицы RecipeSimilarity, от самого похожего.
+        """
+        recipe = generics.get_object_or_404(Recipe.objects.only('id'), pk=pk)
+        similar = [
+            similarity.similar for similarity in
+            RecipeSimilarity.objects.filter(recipe=recipe)
+            .select_related('similar').order_by('-score', 'similar_id')
+        ]
+        return Response(RecipeShortSerializer(
+            similar, many=True, context=self.get_serializer_context()
+        ).data)
+
     @action(
         detail=False,
         methods=('get',),
@@ -282,28 +644,6 @@ class RecipeViewSet(viewsets.ModelViewSet):
         permission_classes=(permissions.IsAuthenticated,)
     )
     def download_shopping_cart(self, request):
-        user = request.user
-        ingredients = (
-            RecipeIngredient.objects
-            .filter(recipe__in_cart__user=user)
-            .values(
-                name=F('ingredient__name'),
-                unit=F('ingredient__measurement_unit')
-            )
-            .annotate(amount=Sum('amount'))
-            .order_by('name')
+        return shopping_list_response(
+            shopping_list(request.user), 'shopping_list.txt'
         )
-        lines = [
-            f'{item["name"]}. Единица измерения: {item["unit"]}, '
-            f'количество: {item["amount"]}.'
-            for item in ingredients
-        ]
-        content = '\n'.join(lines)
-        response = HttpResponse(
-            content,
-            content_type='text/plain; charset=utf-8'
-        )
-        response['Content-Disposition'] = (
-            'attachment; filename="shopping_list.txt"'
-        )
-        return response
@@ -0,0 +1,66 @@
+import inspect
+import time
+
+from django.db import connections
+from django.urls import get_resolver
+from recipes.models import Ingredient, Tag
+from rest_framework import serializers
+
+from . import serializers as api_serializers
+
+
+def warm_up_urls():
+    """
+    Строит таблицы разрешения и обратного построения URL.
+    """
+    resolver = get_resolver()
+    resolver.reverse_dict
+    resolver.resolve('/api/recipes/')
+
+
+def warm_up_serializers():
+    """
+    Строит поля всех сериализаторов API, заполняя кэши метаданных
+    моделей, которые DRF использует при первом запросе.
+    """
+    for _, serializer_class in inspect.getmembers(
+        api_serializers, inspect.isclass
+    ):
+        if (
+            issubclass(serializer_class, serializers.Serializer)
+            and serializer_class.__module__ == api_serializers.__name__
+        ):
+            serializer_class(context={}).fields
+
+
+def warm_up_database():
+    """
+    Открывает соединения со всеми базами данных и выполняет запросы
+    списков тегов и ингредиентов, чтобы первые запросы пользователей
+    не ждали подключения и чтения с диска.
+    """
+    for connection in connections.all():
+        connection.ensure_connection()
+    list(Tag.objects.all())
+    list(Ingredient.objects.all()[:100])
+
+
+WARMUP_STEPS = (
+    ('urls', warm_up_urls),
+    ('serializers', warm_up_serializers),
+    ('database', warm_up_database),
+)
+
+
+def warm_up(steps=None):
+    """
+    Выполняет шаги прогрева и возвращает время каждого шага в секундах.
+    """
+    timings = {}
+    for name, step in WARMUP_STEPS:
+        if steps is not None and name not in steps:
+            continue
+        started = time.perf_counter()
+        step()
+        timings[name] = time.perf_counter() - started
+    return timings
@@ -0,0 +1,22 @@
+from functools import partial
+
+from django.db.backends.postgresql import base
+
+from .pool import get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    Бэкенд PostgreSQL, который берет соединения из пула процесса
+    и возвращает их туда вместо закрытия.
+    Размер пула задается ключом POOL в настройках базы данных.
+    """
+    def get_new_connection(self, conn_params):
+        return get_pool(self.alias, self.settings_dict).get(
+            partial(super().get_new_connection, conn_params)
+        )
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                get_pool(self.alias, self.settings_dict).put(self.connection)
@@ -0,0 +1,46 @@
+from django.db import models
+
+
+class VersionedModel(models.Model):
+    """
+    Абстрактная модель с номером версии и временем изменения.
+    При каждом сохранении существующей записи, в том числе
+    с update_fields, версия увеличивается на единицу в базе данных,
+    поэтому параллельные сохранения не получают одинаковый номер.
+    Массовые операции (update, bulk_update) версию не меняют.
+    Сохранение с update_fields только из unversioned_fields (полей,
+    которых нет в ответах API) версию тоже не меняет. Сохранение
+    с пустым update_fields увеличивает только версию: так отмечаются
+    изменения связанных строк (тегов, ингредиентов).
+    """
+    unversioned_fields = ()
+
+    version = models.PositiveIntegerField(
+        default=1,
+        editable=False,
+        verbose_name='Версия'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name='Дата изменения'
+    )
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        versioned = not self._state.adding and (
+            not update_fields
+            or not set(update_fields) <= set(self.unversioned_fields)
+        )
+        if versioned:
+            self.version = models.F('version') + 1
+            if update_fields is not None:
+                kwargs['update_fields'] = {
+                    *update_fields, 'version', 'updated_at'
+                }
+        super().save(*args, **kwargs)
+        if versioned:
+            self.refresh_from_db(fields=('version',))
@@ -0,0 +1,166 @@
+import os
+import threading
+import time
+from collections import deque
+
+from psycopg2 import OperationalError
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """
+    Пул соединений с PostgreSQL внутри процесса.
+    Держит до size открытых соединений, при нехватке открывает до
+    max_overflow дополнительных, которые закрываются после возврата.
+    Если свободных соединений нет, ждет не дольше timeout секунд.
+    При health_checks соединение проверяется перед выдачей.
+    """
+    def __init__(self, alias, size, max_overflow, timeout, health_checks):
+        self.alias = alias
+        self.health_checks = health_checks
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.pid = os.getpid()
+        self.idle = deque()
+        self.condition = threading.Condition()
+        self.opened = 0
+        self.in_use = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_time = 0
+        self.timeouts = 0
+        self.discarded = 0
+
+    def get(self, connect):
+        while True:
+            connection = self._checkout()
+            if connection is None:
+                break
+            if self._is_usable(connection):
+                return connection
+            with self.condition:
+                self.opened -= 1
+                self.in_use -= 1
+                self.discarded += 1
+                self.condition.notify()
+        try:
+            return connect()
+        except Exception:
+            with self.condition:
+                self.opened -= 1
+                self.in_use -= 1
+                self.condition.notify()
+            raise
+
+    def _checkout(self):
+        """
+        Возвращает свободное соединение или None, если можно открыть новое.
+        """
+        with self.condition:
+            started = None
+            while True:
+                if self.idle:
+                    self._checked_out(started)
+                    return self.idle.pop()
+                if self.opened < self.size + self.max_overflow:
+                    self.opened += 1
+                    self._checked_out(started)
+                    return None
+                if started is None:
+                    started = time.monotonic()
+                    self.waits += 1
+                remaining = self.timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    self.timeouts += 1
+                    self.wait_time += time.monotonic() - started
+                    raise OperationalError(
+                        f'Пул соединений {self.alias} исчерпан: нет '
+                        f'свободного соединения за {self.timeout} с.'
+                    )
+                self.condition.wait(remaining)
+
+    def _is_usable(self, connection):
+        if connection.closed:
+            return False
+        if not self.health_checks:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except Exception:
+            connection.close()
+            return False
+        return True
+
+    def _checked_out(self, started):
+        self.in_use += 1
+        self.checkouts += 1
+        if started is not None:
+            self.wait_time += time.monotonic() - started
+
+    def put(self, connection):
+        if not connection.closed and not self._reset(connection):
+            connection.close()
+        with self.condition:
+            self.in_use -= 1
+            if connection.closed or self.opened > self.size:
+                if not connection.closed:
+                    connection.close()
+                self.opened -= 1
+                self.discarded += 1
+            else:
+                self.idle.append(connection)
+            self.condition.notify()
+
+    def _reset(self, connection):
+        try:
+            if connection.get_transaction_status() != 0:
+                connection.rollback()
+        except Exception:
+            return False
+        return True
+
+    def stats(self):
+        with self.condition:
+            return {
+                'alias': self.alias,
+                'size': self.size,
+                'max_overflow': self.max_overflow,
+                'opened': self.opened,
+                'in_use': self.in_use,
+                'idle': len(self.idle),
+                'overflow': max(self.opened - self.size, 0),
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'wait_time': self.wait_time,
+                'timeouts': self.timeouts,
+                'discarded': self.discarded,
+            }
+
+
+def get_pool(alias, settings_dict):
+    pool = pools.get(alias)
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+    with pools_lock:
+        pool = pools.get(alias)
+        if pool is None or pool.pid != os.getpid():
+            options = settings_dict.get('POOL', {})
+            pool = pools[alias] = ConnectionPool(
+                alias,
+                size=options.get('SIZE', 10),
+                max_overflow=options.get('MAX_OVERFLOW', 10),
+                timeout=options.get('TIMEOUT', 10),
+                health_checks=settings_dict.get('CONN_HEALTH_CHECKS', False),
+            )
+        return pool
+
+
+def pool_stats():
+    return [
+        pool.stats() for pool in list(pools.values())
+        if pool.pid == os.getpid()
+    ]
@@ -0,0 +1,67 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+replica_reads = ContextVar('replica_reads', default=False)
+
+
+def enable_replica_reads():
+    """
+    Направляет последующие чтения на реплики, если они настроены.
+    Возвращает токен для reset_replica_reads.
+    """
+    return replica_reads.set(bool(settings.DATABASE_REPLICAS))
+
+
+def reset_replica_reads(token):
+    replica_reads.reset(token)
+
+
+@contextmanager
+def use_replicas():
+    token = enable_replica_reads()
+    try:
+        yield
+    finally:
+        reset_replica_reads(token)
+
+
+def pin_key(user):
+    return f'db-primary-pin:{user.pk}'
+
+
+def pin_to_primary(user):
+    """
+    Закрепляет чтения пользователя за основной базой на короткое время
+    после записи, чтобы он видел свои изменения до репликации.
+    """
+    if settings.DATABASE_REPLICAS and user.is_authenticated:
+        cache.set(pin_key(user), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(user):
+    return user.is_authenticated and cache.get(pin_key(user), False)
+
+
+class ReplicaRouter:
+    """
+    Роутер баз данных.
+    Записи всегда идут в default, чтения — на случайную реплику только
+    внутри use_replicas(), иначе тоже в default.
+    """
+    def db_for_read(self, model, **hints):
+        if replica_reads.get():
+            return random.choice(settings.DATABASE_REPLICAS)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
@@ -32,6 +32,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -61,17 +62,100 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'backend.wsgi.application'
 
+# Пул соединений внутри процесса для потоковых и ASGI-воркеров.
+# Соединения возвращаются в пул в конце запроса, поэтому CONN_MAX_AGE
+# при включенном пуле равен 0.
+DB_POOL_ENABLED = config('DB_POOL_ENABLED', default=False, cast=bool)
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': (
+            'backend.db' if DB_POOL_ENABLED
+            else 'django.db.backends.postgresql'
+        ),
         'NAME': os.getenv('POSTGRES_DB', 'django'),
         'USER': os.getenv('POSTGRES_USER', 'django'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
         'HOST': os.getenv('DB_HOST', 'db'),
-        'PORT': os.getenv('DB_PORT', 5432)
+        'PORT': os.getenv('DB_PORT', 5432),
+        'CONN_MAX_AGE': (
+            0 if DB_POOL_ENABLED
+            else config('DB_CONN_MAX_AGE', default=60, cast=int)
+        ),
+        'CONN_HEALTH_CHECKS': config(
+            'DB_CONN_HEALTH_CHECKS', default=True, cast=bool
+        ),
+        'POOL': {
+            'SIZE': config('DB_POOL_SIZE', default=10, cast=int),
+            'MAX_OVERFLOW': config('DB_POOL_MAX_OVERFLOW', default=10, cast=int),
+            'TIMEOUT': config('DB_POOL_TIMEOUT', default=10, cast=float),
+        },
     }
 }
 
+# Реплики для чтения: список хостов через запятую, можно с портом
+# (replica1,replica2:5433). Действия list и retrieve выполняются на
+# репликах, а после записи пользователь на REPLICA_PIN_SECONDS секунд
+# закрепляется за основной базой.
+DATABASE_REPLICAS = []
+
+for index, replica_host in enumerate(
+    filter(None, config('DB_REPLICA_HOSTS', default='').split(',')), start=1
+):
+    host, _, port = replica_host.partition(':')
+    DATABASES[f'replica_{index}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{index}')
+
+DATABASE_ROUTERS = ['backend.db.router.ReplicaRouter']
+
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)
+
+# Общий кэш воркеров (ограничение частоты запросов, закрепление чтений
+# за основной базой). Без CACHE_REDIS_URL у каждого процесса свой кэш.
+CACHE_REDIS_URL = config('CACHE_REDIS_URL', default='')
+if CACHE_REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Стандартные хешеры Django, число одновременных вычислений PBKDF2
+# в процессе ограничено.
+PASSWORD_HASHERS = [
+    'api.hashers.ConcurrencyLimitedPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+PASSWORD_HASHING_CONCURRENCY = config(
+    'PASSWORD_HASHING_CONCURRENCY', default=2, cast=int
+)
+
+# Кэш пользователей по токену в памяти процесса. Записи сбрасываются
+# во всех воркерах через общий кэш, поэтому без CACHE_REDIS_URL
+# кэш по умолчанию отключен. 0 отключает кэш.
+AUTH_TOKEN_CACHE_SECONDS = config(
+    'AUTH_TOKEN_CACHE_SECONDS', default=5 if CACHE_REDIS_URL else 0, cast=int
+)
+AUTH_TOKEN_CACHE_SIZE = config(
+    'AUTH_TOKEN_CACHE_SIZE', default=10000, cast=int
+)
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -93,17 +177,64 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
+    ],
+
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ],
 
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
 
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.TokenBucketThrottle',
+    ],
+
+    'DEFAULT_THROTTLE_RATES': {
+        'short_link': config('THROTTLE_SHORT_LINK', default='120/min'),
+        'registration': config('THROTTLE_REGISTRATION', default='10/hour'),
+        'ingredients': config('THROTTLE_INGREDIENTS', default='120/min'),
+    },
+
+    # Адрес клиента берется из последнего значения X-Forwarded-For,
+    # которое выставляет nginx; значения от клиента не учитываются.
+    'NUM_PROXIES': config('NUM_PROXIES', default=1, cast=int),
+
     'DEFAULT_PAGINATION_CLASS': 'api.paginators.CustomPagination',
     'PAGE_SIZE': 5,
 }
 
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+
+SLOW_REQUEST_THRESHOLD_MS = config(
+    'SLOW_REQUEST_THRESHOLD_MS', default=0, cast=int
+)
+
+# Заголовок Server-Timing раскрывает число SQL-запросов и время
+# обработки, поэтому по умолчанию он отдается только персоналу.
+SERVER_TIMING_ENABLED = config(
+    'SERVER_TIMING_ENABLED', default=DEBUG, cast=bool
+)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api.metrics': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+        },
+    },
+}
+
 DJOSER = {
     'SERIALIZERS': {
         'current_user': 'api.serializers.UserListSerializer',
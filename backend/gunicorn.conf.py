@@ -0,0 +1,74 @@
+"""
+Настройки gunicorn.
+
+Режим воркеров задается переменной GUNICORN_WORKER_MODE:
+- sync — синхронные воркеры, по одному запросу на процесс;
+- gthread — потоковые воркеры, медленная загрузка изображения
+  не блокирует остальные запросы процесса;
+- uvicorn — ASGI-приложение в воркерах uvicorn.
+"""
+import multiprocessing
+
+import decouple
+
+WORKER_CLASSES = {
+    'sync': 'sync',
+    'gthread': 'gthread',
+    'uvicorn': 'uvicorn.workers.UvicornWorker',
+}
+
+worker_mode = decouple.config('GUNICORN_WORKER_MODE', default='gthread')
+if worker_mode not in WORKER_CLASSES:
+    raise ValueError(
+        f'Неизвестный GUNICORN_WORKER_MODE {worker_mode}, '
+        f'допустимые значения: {", ".join(WORKER_CLASSES)}.'
+    )
+
+cpu_count = multiprocessing.cpu_count()
+
+bind = decouple.config('GUNICORN_BIND', default='0.0.0.0:8000')
+wsgi_app = (
+    'backend.asgi:application' if worker_mode == 'uvicorn'
+    else 'backend.wsgi:application'
+)
+worker_class = WORKER_CLASSES[worker_mode]
+# Синхронным воркерам нужно больше процессов, чтобы перекрывать ожидание
+# ввода-вывода; потоковым и асинхронным хватает примерно одного на ядро.
+workers = decouple.config(
+    'GUNICORN_WORKERS',
+    default=cpu_count * 2 + 1 if worker_mode == 'sync' else cpu_count + 1,
+    cast=int
+)
+threads = decouple.config('GUNICORN_THREADS', default=4, cast=int)
+
+# Приложение загружается до fork, и воркеры делят память с мастером
+# через copy-on-write.
+preload_app = True
+
+# Перезапуск воркеров ограничивает рост памяти; разброс не дает всем
+# воркерам перезапуститься одновременно.
+max_requests = decouple.config('GUNICORN_MAX_REQUESTS', default=1000, cast=int)
+max_requests_jitter = decouple.config(
+    'GUNICORN_MAX_REQUESTS_JITTER', default=100, cast=int
+)
+
+timeout = decouple.config('GUNICORN_TIMEOUT', default=30, cast=int)
+graceful_timeout = 30
+keepalive = 5
+
+
+def when_ready(server):
+    # Приложение уже загружено в мастере (preload_app): таблицы URL
+    # и метаданные моделей строятся один раз и достаются воркерам
+    # после fork.
+    from api.warmup import warm_up
+
+    warm_up(('urls', 'serializers'))
+
+
+def post_worker_init(worker):
+    # Соединения с базой данных нельзя передавать через fork, поэтому
+    # каждый воркер открывает свои до приема запросов.
+    from api.warmup import warm_up
+
+    warm_up(('database',))
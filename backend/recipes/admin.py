@@ -1,6 +1,8 @@
 from django.contrib import admin
+from django.db.models import Count, Prefetch
 from django.utils.safestring import mark_safe
-from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
+from recipes.models import Ingredient, MealPlan, Recipe, RecipeIngredient, Tag
+from recipes.rollups import refresh_rollups
 
 
 @admin.register(Ingredient)
@@ -9,9 +11,17 @@ class IngredientAdmin(admin.ModelAdmin):
     search_fields = ('name', 'measurement_unit')
     list_filter = ('measurement_unit',)
 
-    @admin.display(description='Использовано в рецептах')
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            recipes_count=Count('recipeingredient')
+        )
+
+    @admin.display(
+        description='Использовано в рецептах',
+        ordering='recipes_count'
+    )
     def recipes_count(self, obj):
-        return RecipeIngredient.objects.filter(ingredient=obj).count()
+        return obj.recipes_count
 
 
 @admin.register(Tag)
@@ -23,6 +33,7 @@ class TagAdmin(admin.ModelAdmin):
 class RecipeIngredientInline(admin.TabularInline):
     model = RecipeIngredient
     extra = 1
+    autocomplete_fields = ('ingredient',)
 
 
 @admin.register(Recipe)
@@ -36,10 +47,25 @@ class RecipeAdmin(admin.ModelAdmin):
         'image_tag',
         'favorites_count'
     )
+    list_select_related = ('author',)
     search_fields = ('name', 'author__email', 'author__username', 'tags__name')
-    list_filter = ('author', 'tags')
+    list_filter = ('tags',)
+    autocomplete_fields = ('author', 'tags')
     inlines = [RecipeIngredientInline]
 
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        refresh_rollups(form.instance)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related(
+            'tags',
+            Prefetch(
+                'recipe_ingredients',
+                queryset=RecipeIngredient.objects.select_related('ingredient')
+            )
+        )
+
     @admin.display(description='Время готовки (мин)')
     def cooking_time_with_unit(self, obj):
         return f'{obj.cooking_time} мин'
@@ -68,12 +94,27 @@ class RecipeAdmin(admin.ModelAdmin):
             )
         return '-'
 
-    @admin.display(description='В избранном')
-    def favorites_count(self, obj):
-        return obj.favorites.count() if hasattr(obj, 'favorites') else 0
-
 
 @admin.register(RecipeIngredient)
 class RecipeIngredientAdmin(admin.ModelAdmin):
     list_display = ('id', 'recipe', 'ingredient', 'amount')
+    list_select_related = ('recipe', 'ingredient')
     search_fields = ('recipe__name', 'ingredient__name')
+    autocomplete_fields = ('recipe', 'ingredient')
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        refresh_rollups(obj.recipe)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        refresh_rollups(obj.recipe)
+
+
+@admin.register(MealPlan)
+class MealPlanAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'date', 'recipe', 'servings')
+    list_select_related = ('user', 'recipe')
+    list_filter = ('date',)
+    search_fields = ('user__email', 'recipe__name')
+    autocomplete_fields = ('recipe',)
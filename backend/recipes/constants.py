@@ -4,3 +4,25 @@ MAX_COOKING_TIME = 10000
 MIN_COOKING_TIME = 1
 MAX_INGREDIENTS_PER_RECIPE = 10000
 MIN_INGREDIENTS_PER_RECIPE = 1
+SHORT_UUID_LENGTH = 6
+ROLLUP_MAX_DIGITS = 12
+ROLLUP_DECIMAL_PLACES = 2
+MIN_SERVINGS = 1
+MAX_SERVINGS = 100
+SIMILAR_RECIPES_COUNT = 10
+# Признаки (ингредиенты и теги), которые есть у большей доли рецептов,
+# но не меньше чем у SIMILARITY_MIN_FEATURE_LIMIT рецептов,
+# не используются для подбора кандидатов в похожие рецепты.
+SIMILARITY_MAX_FEATURE_SHARE = 0.1
+SIMILARITY_MIN_FEATURE_LIMIT = 50
+# Единица измерения -> (каноническая единица семейства, множитель).
+# Количества в эквивалентных единицах списка покупок складываются
+# в канонической единице.
+UNIT_CONVERSIONS = {
+    'г': ('г', 1),
+    'кг': ('г', 1000),
+    'мл': ('мл', 1),
+    'л': ('мл', 1000),
+    'ч. л.': ('ч. л.', 1),
+    'ст. л.': ('ч. л.', 3),
+}
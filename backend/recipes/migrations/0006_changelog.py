@@ -0,0 +1,69 @@
+# Generated by Django 4.2.21 on 2026-10-19 10:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_changelog(apps, schema_editor):
+    """
+    Записывает существующие данные в журнал, чтобы первая
+    синхронизация с токеном 0 вернула их полностью.
+    """
+    ChangeLog = apps.get_model('recipes', 'ChangeLog')
+    sources = (
+        (apps.get_model('recipes', 'Recipe'), 'recipes', None, 'id'),
+        (apps.get_model('recipes', 'Favorite'), 'favorites',
+         'user_id', 'recipe_id'),
+        (apps.get_model('recipes', 'ShoppingCart'), 'shopping_cart',
+         'user_id', 'recipe_id'),
+        (apps.get_model('users', 'Subscription'), 'subscriptions',
+         'user_id', 'author_id'),
+    )
+    for model, resource, user_field, object_field in sources:
+        fields = [field for field in (user_field, object_field) if field]
+        rows = model.objects.order_by('id').values_list(*fields)
+        ChangeLog.objects.bulk_create(
+            (
+                ChangeLog(
+                    user_id=row[0] if user_field else None,
+                    resource=resource,
+                    object_id=row[-1],
+                    action='upsert',
+                )
+                for row in rows.iterator()
+            ),
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0005_recipe_version_alter_recipe_updated_at'),
+        ('users', '0003_myuser_updated_at_myuser_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource', models.CharField(choices=[('recipes', 'Рецепт'), ('favorites', 'Избранное'), ('shopping_cart', 'Корзина покупок'), ('subscriptions', 'Подписка')], max_length=16, verbose_name='Ресурс')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='Объект')),
+                ('action', models.CharField(choices=[('upsert', 'Создание или изменение'), ('delete', 'Удаление')], max_length=6, verbose_name='Действие')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата изменения')),
+                ('user', models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Запись журнала изменений',
+                'verbose_name_plural': 'Журнал изменений',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['user', 'id'], name='changelog_user_id_idx')],
+            },
+        ),
+        migrations.RunPython(
+            backfill_changelog, migrations.RunPython.noop
+        ),
+    ]
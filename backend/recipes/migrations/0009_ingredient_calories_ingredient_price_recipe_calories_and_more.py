@@ -0,0 +1,34 @@
+# Generated by Django 4.2.21 on 2026-10-19 10:53
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_recipesimilarity_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingredient',
+            name='calories',
+            field=models.DecimalField(blank=True, decimal_places=4, help_text='Килокалорий в одной единице измерения', max_digits=10, null=True, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Калорийность'),
+        ),
+        migrations.AddField(
+            model_name='ingredient',
+            name='price',
+            field=models.DecimalField(blank=True, decimal_places=4, help_text='Цена одной единицы измерения', max_digits=10, null=True, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Цена'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='calories',
+            field=models.DecimalField(db_index=True, decimal_places=2, editable=False, help_text='Сумма по ингредиентам, если у всех задана калорийность', max_digits=12, null=True, verbose_name='Калорийность, ккал'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='cost',
+            field=models.DecimalField(db_index=True, decimal_places=2, editable=False, help_text='Сумма по ингредиентам, если у всех задана цена', max_digits=12, null=True, verbose_name='Стоимость'),
+        ),
+    ]
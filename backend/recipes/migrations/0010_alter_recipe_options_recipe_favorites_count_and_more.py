@@ -0,0 +1,81 @@
+# Generated by Django 4.2.21 on 2026-10-19 10:56
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+
+
+def backfill_favorites_count(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Favorite = apps.get_model('recipes', 'Favorite')
+    Recipe.objects.filter(favorited_by__isnull=False).update(
+        favorites_count=Subquery(
+            Favorite.objects.filter(recipe=OuterRef('pk'))
+            .values('recipe')
+            .annotate(count=Count('pk'))
+            .values('count')
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_ingredient_calories_ingredient_price_recipe_calories_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='recipe',
+            options={'ordering': ['name', 'id'], 'verbose_name': 'Рецепт', 'verbose_name_plural': 'Рецепты'},
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Количество добавлений в избранное', verbose_name='В избранном'),
+        ),
+        migrations.RunPython(
+            backfill_favorites_count, migrations.RunPython.noop
+        ),
+        migrations.AlterField(
+            model_name='recipe',
+            name='calories',
+            field=models.DecimalField(decimal_places=2, editable=False, help_text='Сумма по ингредиентам, если у всех задана калорийность', max_digits=12, null=True, verbose_name='Калорийность, ккал'),
+        ),
+        migrations.AlterField(
+            model_name='recipe',
+            name='cost',
+            field=models.DecimalField(decimal_places=2, editable=False, help_text='Сумма по ингредиентам, если у всех задана цена', max_digits=12, null=True, verbose_name='Стоимость'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['name', 'id'], include=('cooking_time',), name='recipe_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['cooking_time', 'id'], name='recipe_cooking_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['id'], include=('cooking_time',), name='recipe_newest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['favorites_count', 'id'], include=('cooking_time',), name='recipe_popularity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(models.OrderBy(models.F('calories'), nulls_last=True), models.OrderBy(models.F('id')), include=('cooking_time',), name='recipe_calories_asc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(models.OrderBy(models.F('calories'), descending=True, nulls_last=True), models.OrderBy(models.F('id'), descending=True), include=('cooking_time',), name='recipe_calories_desc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(models.OrderBy(models.F('cost'), nulls_last=True), models.OrderBy(models.F('id')), include=('cooking_time',), name='recipe_cost_asc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(models.OrderBy(models.F('cost'), descending=True, nulls_last=True), models.OrderBy(models.F('id'), descending=True), include=('cooking_time',), name='recipe_cost_desc_idx'),
+        ),
+    ]
@@ -1,12 +1,20 @@
 import uuid
 
+from backend.db.models import VersionedModel
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from users.models import MyUser
 
 from .constants import (MAX_COOKING_TIME, MAX_INGREDIENTS_PER_RECIPE,
                         MAX_LENGTH_MEASUREMENT_UNIT, MAX_LENGTH_NAME,
-                        MIN_COOKING_TIME, MIN_INGREDIENTS_PER_RECIPE)
+                        MAX_SERVINGS, MIN_COOKING_TIME,
+                        MIN_INGREDIENTS_PER_RECIPE, MIN_SERVINGS,
+                        ROLLUP_DECIMAL_PLACES, ROLLUP_MAX_DIGITS,
+                        SHORT_UUID_LENGTH)
+
+
+def generate_short_uuid():
+    return uuid.uuid4().hex[:SHORT_UUID_LENGTH]
 
 
 class Tag(models.Model):
@@ -17,6 +25,11 @@ class Tag(models.Model):
         verbose_name='Название тега'
     )
     slug = models.SlugField(unique=True, verbose_name='Слаг',)
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name='Дата изменения'
+    )
 
     def __str__(self):
         return self.name
@@ -38,6 +51,29 @@ class Ingredient(models.Model):
         help_text='Единица измерения',
         verbose_name='Единица измерения'
     )
+    calories = models.DecimalField(
+        max_digits=10,
+        decimal_places=4,
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(0)],
+        help_text='Килокалорий в одной единице измерения',
+        verbose_name='Калорийность'
+    )
+    price = models.DecimalField(
+        max_digits=10,
+        decimal_places=4,
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(0)],
+        help_text='Цена одной единицы измерения',
+        verbose_name='Цена'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name='Дата изменения'
+    )
 
     def __str__(self):
         return f'{self.name} ({self.measurement_unit})'
@@ -54,7 +90,7 @@ class Ingredient(models.Model):
         ]
 
 
-class Recipe(models.Model):
+class Recipe(VersionedModel):
     author = models.ForeignKey(
         MyUser,
         on_delete=models.CASCADE,
@@ -95,10 +131,32 @@ class Recipe(models.Model):
         verbose_name='Время приготовления (минуты)'
     )
     short_uuid = models.CharField(max_length=10, unique=True, blank=True)
+    calories = models.DecimalField(
+        max_digits=ROLLUP_MAX_DIGITS,
+        decimal_places=ROLLUP_DECIMAL_PLACES,
+        null=True,
+        editable=False,
+        help_text='Сумма по ингредиентам, если у всех задана калорийность',
+        verbose_name='Калорийность, ккал'
+    )
+    cost = models.DecimalField(
+        max_digits=ROLLUP_MAX_DIGITS,
+        decimal_places=ROLLUP_DECIMAL_PLACES,
+        null=True,
+        editable=False,
+        help_text='Сумма по ингредиентам, если у всех задана цена',
+        verbose_name='Стоимость'
+    )
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='Количество добавлений в избранное',
+        verbose_name='В избранном'
+    )
 
     def save(self, *args, **kwargs):
         if not self.short_uuid:
-            self.short_uuid = uuid.uuid4().hex[:6]
+            self.short_uuid = generate_short_uuid()
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -107,7 +165,67 @@ class Recipe(models.Model):
     class Meta:
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
-        ordering = ['name']
+        ordering = ['name', 'id']
+        # Индексы для каждой сортировки списка рецептов (RecipeFilter):
+        # строки читаются в порядке индекса без сортировки, а
+        # cooking_time в индексе позволяет применить фильтр по времени
+        # приготовления без чтения таблицы (INCLUDE в PostgreSQL).
+        indexes = [
+            models.Index(
+                fields=['name', 'id'],
+                name='recipe_name_idx',
+                include=['cooking_time']
+            ),
+            models.Index(
+                fields=['cooking_time', 'id'],
+                name='recipe_cooking_time_idx'
+            ),
+            models.Index(
+                fields=['id'],
+                name='recipe_newest_idx',
+                include=['cooking_time']
+            ),
+            models.Index(
+                fields=['favorites_count', 'id'],
+                name='recipe_popularity_idx',
+                include=['cooking_time']
+            ),
+            models.Index(
+                models.F('calories').asc(nulls_last=True),
+                models.F('id').asc(),
+                name='recipe_calories_asc_idx',
+                include=['cooking_time']
+            ),
+            models.Index(
+                models.F('calories').desc(nulls_last=True),
+                models.F('id').desc(),
+                name='recipe_calories_desc_idx',
+                include=['cooking_time']
+            ),
+            models.Index(
+                models.F('cost').asc(nulls_last=True),
+                models.F('id').asc(),
+                name='recipe_cost_asc_idx',
+                include=['cooking_time']
+            ),
+            models.Index(
+                models.F('cost').desc(nulls_last=True),
+                models.F('id').desc(),
+                name='recipe_cost_desc_idx',
+                include=['cooking_time']
+            ),
+            # Страница автора: сортировка по умолчанию и newest. Прочие
+            # сортировки рецептов одного автора сортируют его рецепты
+            # после поиска по индексу, их немного.
+            models.Index(
+                fields=['author', 'name', 'id'],
+                name='recipe_author_name_idx'
+            ),
+            models.Index(
+                fields=['author', 'id'],
+                name='recipe_author_newest_idx'
+            ),
+        ]
 
 
 class RecipeIngredient(models.Model):
@@ -187,3 +305,145 @@ class Favorite(models.Model):
                 name='unique_user_recipe_favorite'
             )
         ]
+
+
+class MealPlan(models.Model):
+    """
+    Рецепт в плане питания пользователя на дату.
+    Количества ингредиентов рецепта умножаются на servings.
+    """
+    user = models.ForeignKey(
+        MyUser,
+        on_delete=models.CASCADE,
+        related_name='meal_plans',
+        verbose_name='Пользователь'
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='meal_plans',
+        verbose_name='Рецепт'
+    )
+    date = models.DateField(verbose_name='Дата')
+    servings = models.PositiveSmallIntegerField(
+        default=MIN_SERVINGS,
+        validators=[
+            MinValueValidator(MIN_SERVINGS),
+            MaxValueValidator(MAX_SERVINGS)
+        ],
+        verbose_name='Порции'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
+
+    class Meta:
+        verbose_name = 'План питания'
+        verbose_name_plural = 'Планы питания'
+        ordering = ['date', 'id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'date', 'recipe'],
+                name='unique_user_date_recipe_meal_plan'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.date}: {self.recipe} x{self.servings}'
+
+
+class RecipeSimilarity(models.Model):
+    """
+    Похожий рецепт: один из SIMILAR_RECIPES_COUNT ближайших соседей
+    рецепта по коэффициенту Жаккара наборов ингредиентов и тегов.
+    Заполняется командой build_similar_recipes и обновляется
+    при изменении рецепта.
+    """
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='similarities',
+        db_index=False,
+        verbose_name='Рецепт'
+    )
+    similar = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Похожий рецепт'
+    )
+    score = models.FloatField(verbose_name='Сходство')
+
+    class Meta:
+        verbose_name = 'Похожий рецепт'
+        verbose_name_plural = 'Похожие рецепты'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recipe', 'similar'],
+                name='unique_recipe_similarity'
+            )
+        ]
+
+
+class ChangeLog(models.Model):
+    """
+    Журнал изменений для синхронизации клиентов.
+    Записи только добавляются, номер записи служит токеном
+    синхронизации. Изменения рецептов общие для всех пользователей
+    (user не задан), изменения избранного, корзины и подписок
+    относятся к их владельцу.
+    """
+    RECIPE = 'recipes'
+    FAVORITE = 'favorites'
+    SHOPPING_CART = 'shopping_cart'
+    SUBSCRIPTION = 'subscriptions'
+    RESOURCES = (
+        (RECIPE, 'Рецепт'),
+        (FAVORITE, 'Избранное'),
+        (SHOPPING_CART, 'Корзина покупок'),
+        (SUBSCRIPTION, 'Подписка'),
+    )
+    UPSERT = 'upsert'
+    DELETE = 'delete'
+    ACTIONS = (
+        (UPSERT, 'Создание или изменение'),
+        (DELETE, 'Удаление'),
+    )
+
+    user = models.ForeignKey(
+        MyUser,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Пользователь'
+    )
+    resource = models.CharField(
+        max_length=16,
+        choices=RESOURCES,
+        verbose_name='Ресурс'
+    )
+    object_id = models.PositiveBigIntegerField(verbose_name='Объект')
+    action = models.CharField(
+        max_length=6,
+        choices=ACTIONS,
+        verbose_name='Действие'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата изменения'
+    )
+
+    class Meta:
+        verbose_name = 'Запись журнала изменений'
+        verbose_name_plural = 'Журнал изменений'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['user', 'id'], name='changelog_user_id_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.resource} {self.object_id}: {self.action}'
@@ -0,0 +1,128 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import F
+from django.utils import timezone
+
+from .constants import ROLLUP_DECIMAL_PLACES
+from .models import ChangeLog, Recipe, RecipeIngredient
+
+ROLLUP_FIELDS = (('calories', 'calories'), ('cost', 'price'))
+QUANTUM = Decimal(1).scaleb(-ROLLUP_DECIMAL_PLACES)
+
+
+def recipe_rollups(recipe_ids):
+    """
+    Калорийность и стоимость рецептов: суммы количества ингредиента,
+    умноженного на его калорийность и цену. Если значение не задано
+    хотя бы у одного ингредиента рецепта, итог не определен (None).
+    """
+    totals = defaultdict(lambda: dict.fromkeys(
+        (field for field, _ in ROLLUP_FIELDS), Decimal(0)
+    ))
+    for recipe_id, amount, *values in (
+        RecipeIngredient.objects
+        .filter(recipe_id__in=recipe_ids)
+        .values_list(
+            'recipe_id', 'amount',
+            *(f'ingredient__{source}' for _, source in ROLLUP_FIELDS)
+        )
+        .order_by()
+    ):
+        recipe = totals[recipe_id]
+        for (field, _), value in zip(ROLLUP_FIELDS, values):
+            if value is None or recipe[field] is None:
+                recipe[field] = None
+            else:
+                recipe[field] += amount * value
+    return {
+        recipe_id: {
+            field: None if total is None else total.quantize(QUANTUM)
+            for field, total in recipe.items()
+        }
+        for recipe_id, recipe in totals.items()
+    }
+
+
+def log_recipe_changes(recipe_ids):
+    ChangeLog.objects.bulk_create(
+        ChangeLog(
+            resource=ChangeLog.RECIPE,
+            object_id=recipe_id,
+            action=ChangeLog.UPSERT
+        )
+        for recipe_id in recipe_ids
+    )
+
+
+def refresh_rollups(recipe):
+    """
+    Пересчитывает калорийность и стоимость рецепта после изменения
+    его ингредиентов и обновляет их у объекта.
+    Если значения изменились, вместе с ними увеличивается версия
+    рецепта и время изменения, а изменение записывается в журнал
+    синхронизации.
+    """
+    rollup = recipe_rollups([recipe.pk]).get(
+        recipe.pk, dict.fromkeys(field for field, _ in ROLLUP_FIELDS)
+    )
+    if all(
+        getattr(recipe, field) == value for field, value in rollup.items()
+    ):
+        return
+    Recipe.objects.filter(pk=recipe.pk).update(
+        **rollup, version=F('version') + 1, updated_at=timezone.now()
+    )
+    log_recipe_changes([recipe.pk])
+    for field, value in rollup.items():
+        setattr(recipe, field, value)
+    recipe.refresh_from_db(fields=('version', 'updated_at'))
+
+
+def update_rollups(recipe_ids=None, batch_size=1000):
+    """
+    Пересчитывает калорийность и стоимость рецептов пачками
+    по batch_size рецептов. Рецепты, у которых значения изменились,
+    обновляются одним запросом на пачку вместе с версией и временем
+    изменения и записываются в журнал синхронизации.
+    Без recipe_ids пересчитываются все рецепты.
+    Возвращает количество обработанных рецептов.
+    """
+    if recipe_ids is None:
+        recipe_ids = Recipe.objects.values_list('id', flat=True)
+    recipe_ids = sorted(recipe_ids)
+    fields = [field for field, _ in ROLLUP_FIELDS]
+    empty = dict.fromkeys(fields)
+    for start in range(0, len(recipe_ids), batch_size):
+        batch = recipe_ids[start:start + batch_size]
+        rollups = recipe_rollups(batch)
+        now = timezone.now()
+        changed = [
+            Recipe(
+                id=recipe_id,
+                version=F('version') + 1,
+                updated_at=now,
+                **rollups.get(recipe_id, empty)
+            )
+            for recipe_id, *current in (
+                Recipe.objects.filter(id__in=batch)
+                .values_list('id', *fields).order_by()
+            )
+            if dict(zip(fields, current)) != rollups.get(recipe_id, empty)
+        ]
+        if changed:
+            Recipe.objects.bulk_update(
+                changed, [*fields, 'version', 'updated_at']
+            )
+            log_recipe_changes(recipe.id for recipe in changed)
+    return len(recipe_ids)
+
+
+def update_ingredient_rollups(ingredient_id):
+    """
+    Пересчитывает рецепты, в которых есть ингредиент.
+    """
+    return update_rollups(
+        RecipeIngredient.objects.filter(ingredient_id=ingredient_id)
+        .values_list('recipe_id', flat=True)
+    )
@@ -0,0 +1,67 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from users.models import Subscription
+
+from .models import ChangeLog, Favorite, Ingredient, Recipe, ShoppingCart
+from .rollups import ROLLUP_FIELDS, update_ingredient_rollups
+from .similarity import schedule_similarity_updates
+
+# Модель, ресурс журнала, поле владельца и поле идентификатора объекта.
+TRACKED_MODELS = (
+    (Recipe, ChangeLog.RECIPE, None, 'id'),
+    (Favorite, ChangeLog.FAVORITE, 'user_id', 'recipe_id'),
+    (ShoppingCart, ChangeLog.SHOPPING_CART, 'user_id', 'recipe_id'),
+    (Subscription, ChangeLog.SUBSCRIPTION, 'user_id', 'author_id'),
+)
+
+
+def log_change(sender, instance, signal, **kwargs):
+    _, resource, user_field, object_field = next(
+        tracked for tracked in TRACKED_MODELS if tracked[0] is sender
+    )
+    ChangeLog.objects.create(
+        user_id=getattr(instance, user_field) if user_field else None,
+        resource=resource,
+        object_id=getattr(instance, object_field),
+        action=(
+            ChangeLog.DELETE if signal is post_delete else ChangeLog.UPSERT
+        ),
+    )
+
+
+def schedule_similarity_update(sender, instance, **kwargs):
+    schedule_similarity_updates([instance.pk])
+
+
+def schedule_ingredient_rollup_update(sender, instance, update_fields,
+                                      **kwargs):
+    if update_fields is not None and not update_fields & {
+        source for _, source in ROLLUP_FIELDS
+    }:
+        return
+    transaction.on_commit(
+        partial(update_ingredient_rollups, instance.pk), robust=True
+    )
+
+
+def count_favorite(sender, instance, signal, created=False, **kwargs):
+    if signal is post_save and not created:
+        return
+    Recipe.objects.filter(pk=instance.recipe_id).update(
+        favorites_count=F('favorites_count') + (
+            1 if signal is post_save else -1
+        )
+    )
+
+
+def connect_signals():
+    for model, *_ in TRACKED_MODELS:
+        post_save.connect(log_change, sender=model)
+        post_delete.connect(log_change, sender=model)
+    post_save.connect(count_favorite, sender=Favorite)
+    post_delete.connect(count_favorite, sender=Favorite)
+    post_save.connect(schedule_similarity_update, sender=Recipe)
+    post_save.connect(schedule_ingredient_rollup_update, sender=Ingredient)
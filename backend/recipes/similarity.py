@@ -0,0 +1,252 @@
+import heapq
+from collections import defaultdict
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .constants import (SIMILAR_RECIPES_COUNT, SIMILARITY_MAX_FEATURE_SHARE,
+                        SIMILARITY_MIN_FEATURE_LIMIT)
+from .models import Recipe, RecipeIngredient, RecipeSimilarity
+
+RecipeTag = Recipe.tags.through
+
+
+def feature_rows(recipe_ids=None):
+    """
+    Пары (рецепт, признак). Признак ингредиента — его id,
+    признак тега — id со знаком минус.
+    """
+    ingredients = RecipeIngredient.objects.values_list(
+        'recipe_id', 'ingredient_id'
+    )
+    tags = RecipeTag.objects.values_list('recipe_id', 'tag_id')
+    if recipe_ids is not None:
+        ingredients = ingredients.filter(recipe_id__in=recipe_ids)
+        tags = tags.filter(recipe_id__in=recipe_ids)
+    yield from ingredients.order_by().iterator(chunk_size=10000)
+    for recipe_id, tag_id in tags.order_by().iterator(chunk_size=10000):
+        yield recipe_id, -tag_id
+
+
+def load_features(recipe_ids=None):
+    features = defaultdict(set)
+    for recipe_id, feature in feature_rows(recipe_ids):
+        features[recipe_id].add(feature)
+    return features
+
+
+def feature_limit(recipes_count, max_share, min_limit):
+    """
+    Наибольшее количество рецептов с признаком, при котором признак
+    используется для подбора кандидатов. В небольшом каталоге
+    общие признаки не отбрасываются.
+    """
+    return max(max_share * recipes_count, min_limit)
+
+
+def nearest(own, candidates, features, count):
+    """
+    count кандидатов с наибольшим коэффициентом Жаккара: пары
+    (сходство, id рецепта), при равном сходстве — с меньшим id.
+    """
+    scored = []
+    for candidate in candidates:
+        other = features[candidate]
+        shared = len(own & other)
+        if shared:
+            scored.append(
+                (shared / (len(own) + len(other) - shared), candidate)
+            )
+    return heapq.nlargest(count, scored, key=lambda item: (item[0], -item[1]))
+
+
+def rebuild_similarities(
+    count=SIMILAR_RECIPES_COUNT,
+    max_share=SIMILARITY_MAX_FEATURE_SHARE,
+    min_limit=SIMILARITY_MIN_FEATURE_LIMIT,
+    batch_size=1000,
+):
+    """
+    Пересчитывает похожие рецепты для всех рецептов.
+    Признаки всех рецептов загружаются в память, кандидаты подбираются
+    по инвертированному индексу редких признаков: признаки, которые
+    есть больше чем у max_share рецептов (но не меньше min_limit),
+    почти не различают рецепты, а сравнение по ним было бы
+    квадратичным. Сходство кандидатов
+    считается по всем признакам. Результаты записываются пачками
+    по batch_size рецептов, каждая пачка в своей транзакции.
+    Возвращает количество обработанных рецептов.
+    """
+    features = load_features()
+    limit = feature_limit(len(features), max_share, min_limit)
+    postings = defaultdict(list)
+    for recipe_id, own in features.items():
+        for feature in own:
+            postings[feature].append(recipe_id)
+    postings = {
+        feature: recipe_ids for feature, recipe_ids in postings.items()
+        if 1 < len(recipe_ids) <= limit
+    }
+    recipe_ids = sorted(features)
+    for start in range(0, len(recipe_ids), batch_size):
+        batch = recipe_ids[start:start + batch_size]
+        similarities = []
+        for recipe_id in batch:
+            own = features[recipe_id]
+            candidates = set()
+            for feature in own:
+                candidates.update(postings.get(feature, ()))
+            candidates.discard(recipe_id)
+            similarities.extend(
+                RecipeSimilarity(
+                    recipe_id=recipe_id, similar_id=similar_id, score=score
+                )
+                for score, similar_id in nearest(
+                    own, candidates, features, count
+                )
+            )
+        with transaction.atomic():
+            RecipeSimilarity.objects.filter(recipe_id__in=batch).delete()
+            RecipeSimilarity.objects.bulk_create(similarities)
+    return len(recipe_ids)
+
+
+def feature_counts(own):
+    """
+    Количество рецептов с каждым из признаков own.
+    """
+    counts = dict(
+        RecipeIngredient.objects
+        .filter(ingredient_id__in=[f for f in own if f > 0])
+        .values('ingredient_id')
+        .annotate(count=Count('recipe_id'))
+        .values_list('ingredient_id', 'count')
+        .order_by()
+    )
+    counts.update(
+        (-tag_id, tag_count) for tag_id, tag_count in
+        RecipeTag.objects
+        .filter(tag_id__in=[-f for f in own if f < 0])
+        .values('tag_id')
+        .annotate(count=Count('recipe_id'))
+        .values_list('tag_id', 'count')
+        .order_by()
+    )
+    return counts
+
+
+def recipes_with(features):
+    """
+    id рецептов, у которых есть хотя бы один из признаков.
+    """
+    return {
+        *RecipeIngredient.objects.filter(
+            ingredient_id__in=[f for f in features if f > 0]
+        ).values_list('recipe_id', flat=True).order_by(),
+        *RecipeTag.objects.filter(
+            tag_id__in=[-f for f in features if f < 0]
+        ).values_list('recipe_id', flat=True).order_by(),
+    }
+
+
+@transaction.atomic
+def update_recipe_similarities(
+    recipe_ids,
+    count=SIMILAR_RECIPES_COUNT,
+    max_share=SIMILARITY_MAX_FEATURE_SHARE,
+    min_limit=SIMILARITY_MIN_FEATURE_LIMIT,
+):
+    """
+    Пересчитывает похожие рецепты для измененных рецептов одним
+    проходом с постоянным числом запросов и обновляет их места
+    в списках других рецептов: измененные рецепты удаляются из всех
+    списков и добавляются в списки кандидатов, у которых они теперь
+    входят в count ближайших. Списки, из которых рецепты выбыли,
+    дополняются при следующем полном пересчете.
+    """
+    recipe_ids = set(recipe_ids)
+    RecipeSimilarity.objects.filter(
+        Q(recipe_id__in=recipe_ids) | Q(similar_id__in=recipe_ids)
+    ).delete()
+    changed = load_features(recipe_ids)
+    if not changed:
+        return
+    limit = feature_limit(Recipe.objects.count(), max_share, min_limit)
+    rare = {
+        feature for feature, feature_count in feature_counts(
+            set().union(*changed.values())
+        ).items()
+        if feature_count <= limit
+    }
+    features = load_features(recipes_with(rare))
+    postings = defaultdict(list)
+    for candidate, candidate_features in features.items():
+        for feature in candidate_features & rare:
+            postings[feature].append(candidate)
+
+    similarities = []
+    incoming = defaultdict(list)
+    for recipe_id, own in changed.items():
+        candidates = set()
+        for feature in own & rare:
+            candidates.update(postings[feature])
+        candidates.discard(recipe_id)
+        scored = nearest(own, candidates, features, len(candidates))
+        similarities.extend(
+            RecipeSimilarity(
+                recipe_id=recipe_id, similar_id=similar_id, score=score
+            )
+            for score, similar_id in scored[:count]
+        )
+        for score, candidate in scored:
+            if candidate not in recipe_ids:
+                incoming[candidate].append((score, recipe_id))
+    RecipeSimilarity.objects.bulk_create(similarities)
+
+    lists = defaultdict(list)
+    for similarity in RecipeSimilarity.objects.filter(
+        recipe_id__in=incoming
+    ).only('id', 'recipe_id', 'similar_id', 'score'):
+        lists[similarity.recipe_id].append(similarity)
+    added, removed = [], []
+    for candidate, scored in incoming.items():
+        current = lists[candidate]
+        # При равном сходстве выше рецепт с меньшим id, как в nearest.
+        ranked = sorted(
+            [
+                (similarity.score, -similarity.similar_id, similarity)
+                for similarity in current
+            ] + [
+                (score, -recipe_id, None) for score, recipe_id in scored
+            ],
+            key=lambda item: item[:2],
+            reverse=True
+        )
+        kept = ranked[:count]
+        removed.extend(
+            similarity.id for _, _, similarity in ranked[count:]
+            if similarity is not None
+        )
+        added.extend(
+            RecipeSimilarity(
+                recipe_id=candidate, similar_id=-negative_id, score=score
+            )
+            for score, negative_id, similarity in kept
+            if similarity is None
+        )
+    RecipeSimilarity.objects.filter(id__in=removed).delete()
+    RecipeSimilarity.objects.bulk_create(added)
+
+
+def schedule_similarity_updates(recipe_ids):
+    """
+    Пересчитывает похожие рецепты для рецептов одним проходом после
+    фиксации транзакции: у рецептов уже сохранены теги и ингредиенты.
+    Ошибка пересчета не отменяет изменение рецептов.
+    """
+    recipe_ids = list(recipe_ids)
+    if recipe_ids:
+        transaction.on_commit(
+            partial(update_recipe_similarities, recipe_ids), robust=True
+        )
@@ -0,0 +1,54 @@
+from api.tests.utils import (create_ingredients, create_recipe, create_tags,
+                             create_user)
+from django.test import TestCase
+from users.models import MyUser
+
+
+class ChangelistQueryBudgetTests(TestCase):
+    """
+    Количество запросов страниц списков админки не зависит
+    от количества строк на странице.
+    """
+    BUDGETS = (
+        ('/admin/recipes/recipe/', 8),
+        ('/admin/recipes/ingredient/', 6),
+        ('/admin/recipes/recipeingredient/', 5),
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = MyUser.objects.create_superuser(
+            email='admin@example.com',
+            username='admin',
+            first_name='admin',
+            last_name='admin',
+            password='password',
+        )
+        cls.author = create_user('author')
+        cls.tags = create_tags(3)
+        cls.ingredients = create_ingredients(5)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def create_recipes(self, count):
+        for index in range(count):
+            create_recipe(
+                self.author,
+                self.tags[:index % 3 + 1],
+                self.ingredients[:index % 5 + 1],
+                name=f'Рецепт {index}',
+            )
+
+    def assert_budgets(self):
+        for url, budget in self.BUDGETS:
+            with self.subTest(url=url), self.assertNumQueries(budget):
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_few_rows(self):
+        self.create_recipes(5)
+        self.assert_budgets()
+
+    def test_many_rows(self):
+        self.create_recipes(60)
+        self.assert_budgets()
@@ -0,0 +1,61 @@
+from decimal import Decimal
+
+from api.tests.utils import create_ingredients, create_recipe, create_user
+from django.test import TestCase
+from recipes.models import ChangeLog, Recipe
+from recipes.rollups import update_rollups
+from rest_framework.test import APIClient
+
+
+class IngredientRollupTests(TestCase):
+    """
+    Изменение цены ингредиента меняет стоимость, версию и время
+    изменения рецепта и записывается в журнал синхронизации.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.ingredient, other = create_ingredients(2)
+        cls.ingredient.price = Decimal('2')
+        cls.ingredient.save()
+        other.price = Decimal('3')
+        other.save()
+        cls.recipe = create_recipe(
+            create_user('author'), ingredients=[cls.ingredient, other]
+        )
+        update_rollups([cls.recipe.pk])
+
+    def state(self):
+        return Recipe.objects.values_list(
+            'cost', 'version', 'updated_at'
+        ).get(pk=self.recipe.pk)
+
+    def recipe_changes(self):
+        return ChangeLog.objects.filter(
+            resource=ChangeLog.RECIPE, object_id=self.recipe.pk
+        ).count()
+
+    def test_price_change_updates_recipe(self):
+        cost, version, updated_at = self.state()
+        self.assertEqual(cost, Decimal('8'))
+        changes = self.recipe_changes()
+        client = APIClient()
+        url = f'/api/recipes/{self.recipe.pk}/'
+        etag = client.get(url)['ETag']
+        self.ingredient.price = Decimal('5')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ingredient.save()
+        new_cost, new_version, new_updated_at = self.state()
+        self.assertEqual(new_cost, Decimal('11'))
+        self.assertEqual(new_version, version + 1)
+        self.assertGreater(new_updated_at, updated_at)
+        self.assertEqual(self.recipe_changes(), changes + 1)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['cost'], '11.00')
+
+    def test_unchanged_rollups_keep_version(self):
+        state = self.state()
+        changes = self.recipe_changes()
+        update_rollups()
+        self.assertEqual(self.state(), state)
+        self.assertEqual(self.recipe_changes(), changes)
@@ -1,3 +1,4 @@
+from backend.db.models import VersionedModel
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
@@ -8,7 +9,7 @@ def user_avatar_path(instance, filename):
     return f'avatars/user_{instance.id}/{filename}'
 
 
-class MyUser(AbstractUser):
+class MyUser(VersionedModel, AbstractUser):
     first_name = models.CharField(
         max_length=MAX_LENGTH_USERNAME,
         help_text="Имя",
@@ -33,6 +34,7 @@ class MyUser(AbstractUser):
     )
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
+    unversioned_fields = ('last_login', 'password')
 
     class Meta:
         verbose_name = "Пользователь"
@@ -0,0 +1,33 @@
+from django.contrib.auth.models import update_last_login
+from django.test import TestCase
+from users.models import MyUser
+
+
+class UserVersionTests(TestCase):
+    def setUp(self):
+        self.user = MyUser.objects.create_user(
+            email='user@example.com',
+            username='user',
+            first_name='Имя',
+            last_name='Фамилия',
+            password='password',
+        )
+
+    def version(self):
+        return MyUser.objects.values_list('version', flat=True).get(
+            pk=self.user.pk
+        )
+
+    def test_login_does_not_change_version(self):
+        updated_at = self.user.updated_at
+        update_last_login(None, self.user)
+        self.assertEqual(self.version(), 1)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.updated_at, updated_at)
+
+    def test_rendered_field_changes_version(self):
+        self.user.first_name = 'Другое имя'
+        self.user.save(update_fields=('first_name',))
+        self.assertEqual(self.version(), 2)
+        self.user.save()
+        self.assertEqual(self.version(), 3)